@@ -1,24 +1,51 @@
 import csv
+import fnmatch
+import functools
 import glob
+import hashlib
+import io
+import itertools
 import json
 import logging
 import os
+import re
+import sqlite3
 import subprocess
 import sys
+import threading
+import time
+import urllib.parse
+import xml.etree.ElementTree as ET
+import zipfile
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from contextlib import ExitStack, closing, nullcontext
 from datetime import datetime, timezone
 
 import bcdata
+import boto3
 import click
+import fsspec
 import geopandas
 import jsonschema
+import numpy
 import pandas
+import psycopg2
+import pyarrow
+import pyarrow.csv
+import pyarrow.parquet
+import pyogrio
+import pyogrio.raw
+import shapely
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
+from click.core import ParameterSource
 from pyproj import CRS
-from shapely.geometry.linestring import LineString
-from shapely.geometry.multilinestring import MultiLineString
-from shapely.geometry.multipoint import MultiPoint
-from shapely.geometry.multipolygon import MultiPolygon
-from shapely.geometry.point import Point
-from shapely.geometry.polygon import Polygon
 from slugify import slugify
 from sqlalchemy import create_engine, inspect, text
 
@@ -32,6 +59,20 @@ verbose_opt = click.option("--verbose", "-v", count=True, help="Increase verbosi
 
 quiet_opt = click.option("--quiet", "-q", count=True, help="Decrease verbosity.")
 
+part_size_opt = click.option(
+    "--part_size",
+    type=click.IntRange(min=5),
+    default=64,
+    help="Multipart upload part size (MB), for uploads to object storage",
+)
+
+upload_concurrency_opt = click.option(
+    "--upload_concurrency",
+    type=click.IntRange(min=1),
+    default=8,
+    help="Number of parts of each file to upload to object storage concurrently",
+)
+
 
 def configure_logging(verbosity):
     log_level = max(10, 30 - 10 * verbosity)
@@ -76,20 +117,9 @@ def parse_sources(sources):
     return parsed
 
 
-def validate_file(source):
-    """simple validation of file based sources
-    - file exists
-    - schema is as expected
-    """
-    # load file
-    df = geopandas.read_file(
-        os.path.expandvars(source["source"]),
-        layer=source["layer"],
-        where=source["query"],
-    )
-
-    # are expected columns present?
-    columns = [x.lower() for x in df.columns]
+def validate_columns(source, columns):
+    """are the primary key and field_mapper columns of a source present in columns?"""
+    columns = [x.lower() for x in columns]
     # is primary key present and not null?
     if "primary_key" in source and source["primary_key"]:
         if source["primary_key"].lower() not in columns:
@@ -102,8 +132,41 @@ def validate_file(source):
                 f"Validation error: {source['alias']} - column {column} is not present, modify config 'field_mapper'"
             )
 
+
+def validate_file(source, validate_data=True):
+    """simple validation of file based sources
+    - file exists
+    - schema is as expected
+    - query returns data (if validate_data)
+
+    Reads only the layer schema and (if validate_data) the ids of records matching the
+    query, not the data itself
+    """
+    path = os.path.expandvars(source["source"])
+
+    # are expected columns present?
+    info = pyogrio.read_info(path, layer=source["layer"])
+    validate_columns(source, info["fields"])
+
+    if not validate_data:
+        LOG.info(f"Validation successful: {source['alias']}")
+        return
+
     # is there data?
-    count = len(df.index)
+    if source["query"]:
+        _, fids, _, _ = pyogrio.raw.read(
+            path,
+            layer=source["layer"],
+            where=source["query"],
+            columns=[],
+            read_geometry=False,
+            return_fids=True,
+        )
+        count = len(fids)
+    else:
+        count = pyogrio.read_info(
+            path, layer=source["layer"], force_feature_count=True
+        )["features"]
     if count == 0:
         raise ValueError(
             f"Validation error: {source['alias']} - no data returned, check source and query"
@@ -113,17 +176,38 @@ def validate_file(source):
     LOG.info(f"Validation successful: {source['alias']} - record count: {str(count)}")
 
 
-def validate_bcgw(source):
+def validate_data_frame(source, df):
+    """validate data downloaded from a source - there is data, and expected columns are present"""
+    if len(df.index) == 0:
+        raise ValueError(
+            f"Validation error: {source['alias']} - no data returned, check source and query"
+        )
+    validate_columns(source, df.columns)
+
+
+@functools.cache
+def bcgw_tables():
+    """tables available via WFS, listed once per run"""
+    return frozenset(bcdata.list_tables())
+
+
+@functools.cache
+def bcgw_table_definition(table):
+    """table definition from the data catalogue, requested once per table per run"""
+    return bcdata.get_table_definition(table)
+
+
+def validate_bcgw(source, validate_data=True):
     """validate bcdata sources against bcdc api and wfs"""
     # does source exist as written?
     table = source["source"].upper()
-    if table not in bcdata.list_tables():
+    if table not in bcgw_tables():
         raise ValueError(
             f"Validation error: {source['alias']} - {table} does not exist in BCGW or is not available via WFS"
         )
 
     # get columns present in source from data catalogue
-    table_def = bcdata.get_table_definition(table)
+    table_def = bcgw_table_definition(table)
     columns = [c["column_name"] for c in table_def["schema"]]
 
     # is primary key present and not null?
@@ -141,6 +225,10 @@ def validate_bcgw(source):
                     f"Validation error: {source['alias']} - column {column} is not present in {table}, modify config 'field_mapper'"
                 )
 
+    if not validate_data:
+        LOG.info(f"Validation successful: {source['alias']}")
+        return
+
     # is there data?
     count = bcdata.get_count(table, query=source["query"])
     if count == 0:
@@ -156,32 +244,54 @@ def to_multipart(df):
     """
     geopandas has no built-in func for dumping singlepart to multipart
     https://gis.stackexchange.com/questions/311320/casting-geometry-to-multi-using-geopandas
+
+    Promotes each singlepart type in bulk, with shapely array functions
     """
-    df["geom"] = [
-        MultiPoint([feature]) if isinstance(feature, Point) else feature
-        for feature in df["geom"]
-    ]
-    df["geom"] = [
-        MultiLineString([feature]) if isinstance(feature, LineString) else feature
-        for feature in df["geom"]
-    ]
-    df["geom"] = [
-        MultiPolygon([feature]) if isinstance(feature, Polygon) else feature
-        for feature in df["geom"]
-    ]
+    geoms = df["geom"].to_numpy(copy=True)
+    type_ids = shapely.get_type_id(geoms)
+    for singlepart, to_multi in (
+        ([0], shapely.multipoints),
+        ([1, 2], shapely.multilinestrings),  # linestrings and linearrings
+        ([3], shapely.multipolygons),
+    ):
+        mask = numpy.isin(type_ids, singlepart)
+        if mask.any():
+            geoms[mask] = to_multi(geoms[mask].reshape(-1, 1))
+    df["geom"] = geopandas.GeoSeries(geoms, index=df.index, crs=df.crs)
     return df
 
 
-def validate_sources(sources, validate_data=True, alias=None):
+def validate_source(source, validate_data=True):
+    """validate a single source (see validate_sources)"""
+    if source["source_type"] == "BCGW":
+        validate_bcgw(source, validate_data=validate_data)
+    elif source["source_type"] == "FILE":
+        validate_file(source, validate_data=validate_data)
+
+
+def validate_sources(sources, validate_data=True, alias=None, workers=1):
     """
     Validate json, whether data sources exist, and assign hierarchy index
     based on position in list
+
+    With validate_data=False, only the schema of each source is checked, not that its
+    query returns data - for use when the data is about to be downloaded anyway, and is
+    validated then (see validate_data_frame)
+
+    Up to workers sources are validated concurrently. The WFS table listing and the
+    definition of each BCGW table are requested once, up front, however many sources
+    read them
     """
-    for source in sources:
-        if source["source_type"] == "BCGW":
-            validate_bcgw(source)
-        elif source["source_type"] == "FILE":
-            validate_file(source)
+    tables = {s["source"].upper() for s in sources if s["source_type"] == "BCGW"}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        if tables:
+            list(executor.map(bcgw_table_definition, tables & bcgw_tables()))
+        list(
+            executor.map(
+                functools.partial(validate_source, validate_data=validate_data),
+                sources,
+            )
+        )
 
     LOG.info("Validation successful: all layers appear valid")
 
@@ -189,17 +299,86 @@ def validate_sources(sources, validate_data=True, alias=None):
     return sources
 
 
-def download_source(source):
-    """download data from source to a standardized geodataframe"""
+def to_bc_albers(df):
+    """check that a geodataframe read from file has a crs, reproject to BC Albers if
+    necessary and lowercasify the column names"""
+    if not df.crs:
+        raise ValueError(
+            "Source does not have a defined projection/coordinate reference system"
+        )
+    # reproject to BC Albers if necessary
+    if df.crs != CRS.from_user_input(3005):
+        df = df.to_crs("EPSG:3005")
+    # lowercasify column names
+    df.columns = [x.lower() for x in df.columns]
+    return df
+
+
+def read_source(source, query):
+    """read data from source with the given query, to a geodataframe with lowercase columns"""
 
     # download WFS
     if source["source_type"] == "BCGW":
         df = bcdata.get_data(
             source["source"],
-            query=source["query"],
+            query=query,
             as_gdf=True,
             lowercase=True,
         )
+
+    # download file
+    elif source["source_type"] == "FILE":
+        df = to_bc_albers(
+            geopandas.read_file(
+                os.path.expandvars(source["source"]),
+                layer=source["layer"],
+                where=query,
+            )
+        )
+
+    return df
+
+
+def read_source_chunks(source, query, chunk_size):
+    """read data from source with the given query as read_source, but yielding
+    geodataframes of at most chunk_size records rather than reading all data at once
+
+    BCGW sources are read a WFS page at a time, with the page size capped at chunk_size,
+    FILE sources in batches of chunk_size records (via arrow)
+    """
+    if source["source_type"] == "BCGW":
+        wfs = bcdata.wfs.BCWFS()
+        wfs.pagesize = min(wfs.pagesize, chunk_size)
+        for url in wfs.define_requests(source["source"], query=query):
+            df = wfs.request_features(url, as_gdf=True, lowercase=True)
+            if len(df.index):
+                yield df
+
+    elif source["source_type"] == "FILE":
+        with pyogrio.open_arrow(
+            os.path.expandvars(source["source"]),
+            layer=source["layer"],
+            where=query,
+            batch_size=chunk_size,
+            use_pyarrow=True,
+        ) as (meta, reader):
+            geometry_name = meta["geometry_name"] or "wkb_geometry"
+            for batch in reader:
+                if not batch.num_rows:
+                    continue
+                df = batch.to_pandas()
+                yield to_bc_albers(
+                    geopandas.GeoDataFrame(
+                        df.drop(columns=geometry_name),
+                        geometry=shapely.from_wkb(df[geometry_name]),
+                        crs=meta["crs"],
+                    )
+                )
+
+
+def default_primary_key(source):
+    """set the primary key of a BCGW source before it is downloaded - call once per source"""
+    if source["source_type"] == "BCGW":
         # if primary key is not provided in config, default to the pk noted in bcdata
         if ("primary_key" not in source.keys() or not source["primary_key"]) and source[
             "source"
@@ -208,63 +387,523 @@ def download_source(source):
         else:
             source["primary_key"] = None
 
-    # download file
-    elif source["source_type"] == "FILE":
-        df = geopandas.read_file(
-            os.path.expandvars(source["source"]),
-            layer=source["layer"],
-            where=source["query"],
-        )
-        if not df.crs:
-            raise ValueError(
-                "Source does not have a defined projection/coordinate reference system"
-            )
-        # reproject to BC Albers if necessary
-        if df.crs != CRS.from_user_input(3005):
-            df = df.to_crs("EPSG:3005")
-        # lowercasify column names
-        df.columns = [x.lower() for x in df.columns]
+
+def as_text(series):
+    """a column as strings (nulls retained), with integers read as floats (e.g. an integer
+    column with nulls, in some pages/chunks of a source) written without a decimal"""
+    if pandas.api.types.is_float_dtype(series):
+        values = series.dropna()
+        if (values == values.round()).all():
+            series = series.astype("Int64")
+    return series.astype("string")
+
+
+def standardize_source(source, df):
+    """standardize a geodataframe read from source (see read_source)"""
+    validate_data_frame(source, df)
 
     # standardize/tidy the data
     df = df.rename_geometry("geom")
     df = to_multipart(df)  # sources can have mixed types, just make everything multi
 
-    # standardize columns, adding data as required
-    df["__index__"] = source["index"]
-    df["__description__"] = source["description"]
-    df["__alias__"] = source["alias"].lower()
-    df["__primary_key__"] = ""
+    # build the standardized columns in one go - constant data, and the columns we want to
+    # retain from the source under their new names (all incoming data is already
+    # lowercasified)
+    columns = {
+        "index": source["index"],
+        "description": source["description"],
+        "alias": source["alias"].lower(),
+        "primary_key": "",
+    }
     if "primary_key" in source and source["primary_key"]:
-        df["__primary_key__"] = df[source["primary_key"].lower()].astype(
-            "str"
-        )  # handle pks as strings
-
-    # rename columns that we want to retain
+        # handle pks as strings
+        columns["primary_key"] = df[source["primary_key"].lower()].astype("str")
     for key, value in source["field_mapper"].items():
-        if value:
-            df["__" + key + "__"] = df[
-                value.lower()
-            ]  # all incoming data is already lowercasified
+        columns[key] = as_text(df[value.lower()]) if value else None
+    if source["data"]:
+        columns.update(source["data"])
+    columns["geom"] = df["geom"]
+
+    return geopandas.GeoDataFrame(columns, index=df.index, geometry="geom")
+
+
+def download_source(source):
+    """download data from source to a standardized geodataframe"""
+    default_primary_key(source)
+    return standardize_source(source, read_source(source, source["query"]))
+
+
+def source_groups(sources):
+    """group sources that read the same BCGW table or the same file layer
+
+    Groups, and sources within each group, retain their order in sources
+    """
+    groups = {}
+    for source in sources:
+        if source["source_type"] == "BCGW":
+            key = (source["source_type"], source["source"].upper(), None)
         else:
-            df["__" + key + "__"] = None
+            key = (source["source_type"], source["source"], source.get("layer"))
+        groups.setdefault(key, []).append(source)
+    return list(groups.values())
 
-    # add additional constant data
-    if source["data"]:
-        for key, value in source["data"].items():
-            df["__" + key + "__"] = value
-
-    # retain only columns that have just been added
-    columns = (
-        ["index", "description", "alias", "primary_key"]
-        + list(source["field_mapper"])
-        + list(source["data"])
+
+def union_query(sources):
+    """combine the queries of sources reading the same table into one matching any of them"""
+    if not all(source["query"] for source in sources):
+        return None
+    return " OR ".join(f"({source['query']})" for source in sources)
+
+
+def filter_query(df, query):
+    """subset an in-memory geodataframe with a source query
+
+    The query is evaluated by SQLite, against an in-memory copy of the attributes. SQLite
+    supports the subset of ECQL used by sources.json (comparisons, AND/OR/NOT, LIKE, IN,
+    IS NULL) and matches column names case-insensitively. String comparisons are
+    case-sensitive, as on the WFS server - including LIKE, via PRAGMA case_sensitive_like
+    (OGR SQL compares strings case-insensitively, so can not be used here).
+    """
+    if not query:
+        return df
+    attributes = pandas.DataFrame(df.drop(columns=df.geometry.name))
+    attributes["hr_row"] = range(len(attributes))
+    with closing(sqlite3.connect(":memory:")) as conn:
+        conn.execute("PRAGMA case_sensitive_like = ON")
+        attributes.to_sql("source", conn, index=False)
+        rows = [r[0] for r in conn.execute(f"SELECT hr_row FROM source WHERE {query}")]
+    return df.iloc[sorted(rows)]
+
+
+# errors of filter_query on a query (or data) that can not be evaluated locally - by SQLite
+# (e.g. ECQL temporal/spatial operators), or in copying the attributes to it
+FILTER_QUERY_ERRORS = (ValueError, sqlite3.Error, pandas.errors.DatabaseError)
+
+
+def layer_name(source):
+    """name of the cached layer/table for a given source - hr_<index>_<alias>"""
+    return "hr_" + str(source["index"]).zfill(2) + "_" + source["alias"].lower()
+
+
+def source_host(source):
+    """the host a source is downloaded from, used to cap concurrent downloads per host
+
+    All BCGW sources are served by the same WFS. For FILE sources, files on object storage
+    are grouped by bucket, files on a web server by server, and local files together.
+    """
+    if source["source_type"] == "BCGW":
+        return "openmaps.gov.bc.ca"
+    path = os.path.expandvars(source["source"])
+    match = re.search(r"/vsis3/([^/]+)", path)
+    if match:
+        return "s3://" + match.group(1)
+    match = re.search(r"(https?|s3)://([^/]+)", path)
+    if match:
+        return match.group(2)
+    return "local"
+
+
+def download_group(sources):
+    """download a group of sources reading the same table/layer (see source_groups)
+
+    The table is read once, with the union of all source queries, then split into each
+    source locally. Falls back to reading each source separately if a query can not be
+    evaluated locally.
+    """
+    if len(sources) == 1:
+        return [download_source(sources[0])]
+    for source in sources:
+        default_primary_key(source)
+    df = read_source(sources[0], union_query(sources))
+    try:
+        subsets = [filter_query(df, source["query"]) for source in sources]
+    except FILTER_QUERY_ERRORS as e:
+        LOG.warning(
+            f"{sources[0]['source']} - could not split by query locally ({e}), "
+            "reading each source separately"
+        )
+        return [standardize_source(s, read_source(s, s["query"])) for s in sources]
+    return list(
+        itertools.starmap(standardize_source, zip(sources, subsets, strict=True))
     )
-    df = df[["__" + c + "__" for c in columns] + ["geom"]]
 
-    # strip the __ prefix/suffix
-    df = df.rename(columns={"__" + c + "__": c for c in columns})
 
-    return df
+def download_group_chunks(sources, chunk_size):
+    """download a group of sources as download_group, but a chunk of at most chunk_size
+    records at a time, yielding (position of source in sources, standardized chunk)
+
+    Chunks with no records for a given source are skipped, a source with no records at all
+    is never yielded
+    """
+    for source in sources:
+        default_primary_key(source)
+    if len(sources) == 1:
+        for df in read_source_chunks(sources[0], sources[0]["query"], chunk_size):
+            yield 0, standardize_source(sources[0], df)
+        return
+
+    chunks = read_source_chunks(sources[0], union_query(sources), chunk_size)
+    for n, df in enumerate(chunks):
+        try:
+            subsets = [filter_query(df, source["query"]) for source in sources]
+        except FILTER_QUERY_ERRORS as e:
+            # a query that can be evaluated locally against one chunk can be against all
+            # of them, so this only happens on the first chunk, before anything is yielded
+            if n > 0:
+                raise
+            LOG.warning(
+                f"{sources[0]['source']} - could not split by query locally ({e}), "
+                "reading each source separately"
+            )
+            for i, source in enumerate(sources):
+                for df in read_source_chunks(source, source["query"], chunk_size):
+                    yield i, standardize_source(source, df)
+            return
+        for i, (source, subset) in enumerate(zip(sources, subsets, strict=True)):
+            if len(subset.index):
+                yield i, standardize_source(source, subset)
+
+
+PARQUET_COMPRESSION = ["zstd", "snappy", "gzip", "brotli", "lz4", "none"]
+PARQUET_ROW_GROUP_SIZE = 10000
+BBOX_FIELDS = ["xmin", "ymin", "xmax", "ymax"]
+
+
+def sort_spatially(df):
+    """sort a geodataframe along a hilbert curve, so that each parquet row group written
+    from it covers a compact area (null/empty geometries sort last)"""
+    missing = (df.geometry.isna() | df.geometry.is_empty).to_numpy()
+    distance = numpy.full(len(df.index), numpy.inf)
+    if not missing.all():
+        distance[~missing] = df.geometry[~missing].hilbert_distance()
+    return df.iloc[numpy.argsort(distance, kind="stable")]
+
+
+def write_parquet(
+    df, out_file, compression="zstd", compression_level=None, row_group_size=None
+):
+    """write a standardized geodataframe to GeoParquet 1.1, spatially sorted and with a bbox
+    covering column, so readers can skip row groups by bounding box"""
+    sort_spatially(df).to_parquet(
+        out_file,
+        index=False,
+        compression=None if compression == "none" else compression,
+        compression_level=compression_level,
+        row_group_size=row_group_size or PARQUET_ROW_GROUP_SIZE,
+        schema_version="1.1.0",
+        write_covering_bbox=True,
+    )
+
+
+def source_fields(source):
+    """arrow fields of the standardized attribute columns of a source (see
+    standardize_source) - fixed by the source definition, as each chunk of data read may
+    type its columns differently (or not at all, when all null)"""
+    fields = {
+        "index": pyarrow.int64(),
+        "description": pyarrow.string(),
+        "alias": pyarrow.string(),
+        "primary_key": pyarrow.string(),
+    }
+    for key in source["field_mapper"]:
+        fields[key] = pyarrow.string()
+    for key, value in (source["data"] or {}).items():
+        fields[key] = pyarrow.scalar(value).type
+    return list(itertools.starmap(pyarrow.field, fields.items()))
+
+
+def parquet_schema(source, crs):
+    """GeoParquet 1.1 (arrow) schema of a source's standardized data, for writing in chunks
+
+    Geometry types and bbox are not known until all chunks are written, so are not recorded
+    in the geo metadata (the per-row bbox covering column is).
+    """
+    geo = {
+        "version": "1.1.0",
+        "primary_column": "geom",
+        "columns": {
+            "geom": {
+                "encoding": "WKB",
+                "geometry_types": [],
+                "crs": crs.to_json_dict(),
+                "covering": {"bbox": {k: ["bbox", k] for k in BBOX_FIELDS}},
+            }
+        },
+    }
+    bbox = pyarrow.struct([(k, pyarrow.float64()) for k in BBOX_FIELDS])
+    return pyarrow.schema(
+        [
+            *source_fields(source),
+            pyarrow.field("geom", pyarrow.binary()),
+            pyarrow.field("bbox", bbox),
+        ],
+        metadata={"geo": json.dumps(geo)},
+    )
+
+
+def write_parquet_chunk(writer, df, row_group_size=None):
+    """append a standardized geodataframe to a GeoParquet file (see parquet_schema),
+    spatially sorted, as one or more row groups"""
+    df = sort_spatially(df)
+    geoms = df["geom"].to_numpy()
+    bounds = shapely.bounds(geoms)
+    attributes = pyarrow.schema(
+        [f for f in writer.schema if f.name not in ("geom", "bbox")]
+    )
+    table = (
+        pyarrow.Table.from_pandas(
+            pandas.DataFrame(df.drop(columns="geom")),
+            schema=attributes,
+            preserve_index=False,
+        )
+        .append_column("geom", pyarrow.array(shapely.to_wkb(geoms), pyarrow.binary()))
+        .append_column(
+            "bbox",
+            pyarrow.StructArray.from_arrays(
+                [pyarrow.array(bounds[:, i]) for i in range(4)], names=BBOX_FIELDS
+            ),
+        )
+    )
+    writer.write_table(
+        table.replace_schema_metadata(writer.schema.metadata),
+        row_group_size=row_group_size or PARQUET_ROW_GROUP_SIZE,
+    )
+
+
+def cache_group(
+    sources, out_path, host_limit=None, chunk_size=None, parquet_options=None
+):
+    """download a group of sources (see source_groups) and write each to parquet in out_path,
+    returning the files written
+
+    host_limit is an optional semaphore shared by all sources downloaded from the same host,
+    held only while downloading (not while writing)
+
+    With chunk_size, data is streamed to parquet chunk_size records at a time (see
+    download_group_chunks), so memory use is bounded by the chunk size rather than the size
+    of the source. The host_limit is then held until all chunks are written.
+
+    parquet_options are the compression, compression_level and row_group_size of the
+    files written (see write_parquet). Streamed files are sorted spatially within each
+    chunk, rather than as a whole.
+    """
+    parquet_options = parquet_options or {}
+    compression = parquet_options.get("compression", "zstd")
+    # parquet is one file per layer and direct write to s3 is supported
+    out_files = [
+        os.path.join(out_path, layer_name(source) + ".parquet") for source in sources
+    ]
+    if chunk_size:
+        writers = [None] * len(sources)
+        with host_limit or nullcontext(), ExitStack() as stack:
+            for i, df in download_group_chunks(sources, chunk_size):
+                if not writers[i]:
+                    f = stack.enter_context(fsspec.open(out_files[i], "wb"))
+                    writers[i] = stack.enter_context(
+                        pyarrow.parquet.ParquetWriter(
+                            f,
+                            parquet_schema(sources[i], df.crs),
+                            compression=None if compression == "none" else compression,
+                            compression_level=parquet_options.get("compression_level"),
+                        )
+                    )
+                write_parquet_chunk(
+                    writers[i], df, parquet_options.get("row_group_size")
+                )
+        for source, writer in zip(sources, writers, strict=True):
+            if not writer:
+                raise ValueError(
+                    f"Validation error: {source['alias']} - no data returned, check source and query"
+                )
+        return out_files
+
+    with host_limit or nullcontext():
+        dfs = download_group(sources)
+    for df, out_file in zip(dfs, out_files, strict=True):
+        write_parquet(df, out_file, **parquet_options)
+    return out_files
+
+
+CACHE_MANIFEST = "hr_manifest.json"
+
+
+def file_url(path):
+    """fsspec url of the file underlying a GDAL source path
+
+    e.g. /vsizip//vsis3/bucket/sources/CRD.gdb.zip -> s3://bucket/sources/CRD.gdb.zip
+    """
+    path = os.path.expandvars(path)
+    for prefix in ("/vsizip/", "/vsicurl/"):
+        path = path.removeprefix(prefix)
+    if path.startswith("/vsis3/"):
+        path = "s3://" + path.removeprefix("/vsis3/")
+    # drop any path within an archive
+    match = re.match(r"(.*?\.zip)/", path)
+    if match:
+        path = match.group(1)
+    return path
+
+
+def source_fingerprint(source):
+    """fingerprint of a source definition plus a cheap check for upstream changes
+
+    For BCGW sources the upstream check is the table's columns and the record count matching
+    the query, for FILE sources it is the file's size and modification time/ETag. Edits to
+    BCGW records that leave the columns and count unchanged are not detected.
+    """
+    if source["source_type"] == "BCGW":
+        table = source["source"].upper()
+        upstream = {
+            "columns": [
+                c["column_name"] for c in bcgw_table_definition(table)["schema"]
+            ],
+            "count": bcdata.get_count(table, query=source["query"]),
+        }
+    else:
+        fs, path = fsspec.core.url_to_fs(file_url(source["source"]))
+        info = fs.info(path)
+        upstream = {
+            k: str(info[k])
+            for k in ("size", "mtime", "ETag", "LastModified")
+            if k in info
+        }
+    fingerprint = json.dumps(
+        {"source": source, "upstream": upstream}, sort_keys=True, default=str
+    )
+    return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+
+
+def read_manifest(path):
+    """read the cache manifest in path (local or s3://), {layer: fingerprint}"""
+    fs, manifest = fsspec.core.url_to_fs(os.path.join(path, CACHE_MANIFEST))
+    if not fs.exists(manifest):
+        return {}
+    with fs.open(manifest, "r") as f:
+        return json.load(f)
+
+
+def write_manifest(path, manifest):
+    """write the cache manifest to path (local or s3://)"""
+    with fsspec.open(os.path.join(path, CACHE_MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def pg_type(arrow_type):
+    """postgres type of a column of the given arrow type (anything unrecognized is text)"""
+    if pyarrow.types.is_integer(arrow_type):
+        return "bigint"
+    if pyarrow.types.is_floating(arrow_type):
+        return "double precision"
+    if pyarrow.types.is_boolean(arrow_type):
+        return "boolean"
+    if pyarrow.types.is_date(arrow_type):
+        return "date"
+    if pyarrow.types.is_timestamp(arrow_type):
+        return "timestamp"
+    return "text"
+
+
+def parquet_columns(schema):
+    """the geometry column name and the attribute fields of a cached parquet file (from its
+    arrow schema), skipping the bbox covering column and any pandas index"""
+    geom = json.loads(schema.metadata[b"geo"])["primary_column"]
+    attributes = [
+        field
+        for field in schema
+        if field.name not in (geom, "bbox")
+        and not field.name.startswith("__index_level_")
+    ]
+    return geom, attributes
+
+
+def create_table(cursor, table, schema, replace=False, unlogged=False):
+    """create table (if it does not exist) for loading cached parquet files with the given
+    arrow schema, dropping it first if replace. No indexes are created (see index_table)"""
+    geom, attributes = parquet_columns(schema)
+    if replace:
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+    cursor.execute(
+        f"CREATE {'UNLOGGED ' if unlogged else ''}TABLE IF NOT EXISTS {table} ("
+        + "".join(f'"{field.name}" {pg_type(field.type)}, ' for field in attributes)
+        + f'"{geom}" geometry(Geometry, 3005))'
+    )
+
+
+def index_table(cursor, table):
+    """index a loaded table - geometry, hierarchy index and alias - and analyze it"""
+    cursor.execute(
+        f"CREATE INDEX IF NOT EXISTS {table}_geom_idx ON {table} USING gist (geom)"
+    )
+    for column in ("index", "alias"):
+        cursor.execute(
+            f'CREATE INDEX IF NOT EXISTS {table}_{column}_idx ON {table} ("{column}")'
+        )
+    cursor.execute(f"ANALYZE {table}")
+
+
+def load_parquet(conn, in_file, table, replace=False, unlogged=False):
+    """bulk load a cached parquet file (local or s3://) to table with COPY, returning the
+    number of rows loaded
+
+    The file is read and copied a row group at a time, as csv with hex EWKB geometries. The
+    table is created if it does not exist (see create_table). conn is a raw (DBAPI)
+    psycopg2 connection, the caller commits.
+    """
+    count = 0
+    with fsspec.open(in_file, "rb") as f, conn.cursor() as cursor:
+        parquet = pyarrow.parquet.ParquetFile(f)
+        geom, attributes = parquet_columns(parquet.schema_arrow)
+        columns = ", ".join(f'"{field.name}"' for field in attributes)
+        create_table(
+            cursor, table, parquet.schema_arrow, replace=replace, unlogged=unlogged
+        )
+        for batch in parquet.iter_batches(
+            columns=[field.name for field in attributes] + [geom]
+        ):
+            geoms = shapely.from_wkb(batch.column(geom).to_numpy(zero_copy_only=False))
+            ewkb = shapely.to_wkb(
+                shapely.set_srid(geoms, 3005), hex=True, include_srid=True
+            )
+            data = pyarrow.Table.from_batches([batch]).drop_columns(geom)
+            data = data.append_column(geom, pyarrow.array(ewkb, pyarrow.string()))
+            # arrow quotes all strings and leaves nulls empty/unquoted - as COPY expects
+            buffer = pyarrow.BufferOutputStream()
+            pyarrow.csv.write_csv(
+                data, buffer, pyarrow.csv.WriteOptions(include_header=False)
+            )
+            cursor.copy_expert(
+                f'COPY {table} ({columns}, "{geom}") FROM STDIN WITH (FORMAT csv)',
+                pyarrow.BufferReader(buffer.getvalue()),
+            )
+            count += batch.num_rows
+    return count
+
+
+def load_source(db, source, in_path, out_table=None, unlogged=False):
+    """load a cached source to out_table (appending), or if not provided to a table with
+    the layer name (replacing it), over a connection from the db engine's pool. Returns
+    the table loaded"""
+    layer = layer_name(source)
+    table = out_table or layer
+    conn = db.raw_connection()
+    try:
+        start = time.perf_counter()
+        count = load_parquet(
+            conn,
+            os.path.join(in_path, layer + ".parquet"),
+            table,
+            replace=not out_table,
+            unlogged=unlogged,
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    elapsed = time.perf_counter() - start
+    # guard the rate against a zero elapsed time (an empty source, a coarse clock)
+    LOG.info(
+        f"{source['alias']} written to {table} - {count} rows in {elapsed:.1f}s ({count / max(elapsed, 1e-6):.0f} rows/s)"
+    )
+    return table
 
 
 @click.group()
@@ -283,6 +922,11 @@ def cli():
 @click.option(
     "--dry_run", "-t", is_flag=True, help="Validate sources_file only, do not download"
 )
+@click.option(
+    "--no_count",
+    is_flag=True,
+    help="With --dry_run, validate only the schema of each source, without checking that its query returns data",
+)
 @click.option(
     "--out_path",
     "-o",
@@ -290,9 +934,67 @@ def cli():
     default=".",
     help="Output path to write data (local or s3://)",
 )
+@click.option(
+    "--workers",
+    "-w",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of sources to validate and download concurrently",
+)
+@click.option(
+    "--host_workers",
+    type=click.IntRange(min=1),
+    default=4,
+    help="Maximum number of concurrent downloads from any one host (e.g. the BCGW WFS)",
+)
+@click.option(
+    "--incremental",
+    "-i",
+    is_flag=True,
+    help=f"Download only sources that have changed since they were last cached (per {CACHE_MANIFEST}, updated only by incremental runs)",
+)
+@click.option(
+    "--chunk_size",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Stream each source to parquet in chunks of this many records, rather than reading it whole (bounds memory use)",
+)
+@click.option(
+    "--compression",
+    type=click.Choice(PARQUET_COMPRESSION),
+    default="zstd",
+    help="Compression codec of cached parquet files",
+)
+@click.option(
+    "--compression_level",
+    type=int,
+    default=None,
+    help="Compression level of cached parquet files (codec default if not set)",
+)
+@click.option(
+    "--row_group_size",
+    type=click.IntRange(min=1),
+    default=PARQUET_ROW_GROUP_SIZE,
+    help="Maximum number of records per row group of cached parquet files",
+)
 @verbose_opt
 @quiet_opt
-def cache(sources_file, source_alias, dry_run, out_path, verbose, quiet):
+def cache(
+    sources_file,
+    source_alias,
+    dry_run,
+    no_count,
+    out_path,
+    workers,
+    host_workers,
+    incremental,
+    chunk_size,
+    compression,
+    compression_level,
+    row_group_size,
+    verbose,
+    quiet,
+):
     """Download sources defined in provided sources.json file"""
     configure_logging((verbose - quiet))
 
@@ -307,20 +1009,88 @@ def cache(sources_file, source_alias, dry_run, out_path, verbose, quiet):
         else:
             sources = [s for s in sources if s["alias"] == source_alias]
 
-    sources = validate_sources(sources)
+    # when downloading, check just the schema up front - the data itself is validated as it
+    # is downloaded, rather than read twice
+    sources = validate_sources(
+        sources, validate_data=dry_run and not no_count, workers=workers
+    )
 
-    # download each data source, dump to file
+    # download each data source, dump to file - sources reading the same table are
+    # downloaded together. Any failure fails the whole run, cancelling downloads not yet
+    # started
     if not dry_run:
-        for source in sources:
-            df = download_source(source)
-            layer = (
-                "hr_" + str(source["index"]).zfill(2) + "_" + source["alias"].lower()
-            )
-            # parquet is one file per layer and direct write to s3 is supported
-            out_file = os.path.join(out_path, layer + ".parquet")
-            df.to_parquet(out_file)
-
-            LOG.info(f"{source['alias']} written to {out_file}")
+        # if running incrementally, fingerprint the sources before downloading (downloading
+        # fills in primary_key), skipping any unchanged since last cached. Fingerprinting
+        # costs a request or two per source, so full runs don't - they instead drop the
+        # manifest entries of sources they rewrite, for the next incremental run to refresh
+        manifest = read_manifest(out_path)
+        fingerprints = {}
+        if incremental:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                fingerprints = dict(
+                    zip(
+                        [layer_name(s) for s in sources],
+                        executor.map(source_fingerprint, sources),
+                        strict=True,
+                    )
+                )
+            if any(s["source_type"] == "BCGW" for s in sources):
+                LOG.warning(
+                    "BCGW sources are fingerprinted by their columns and record count - "
+                    "edits that leave the count unchanged are not detected"
+                )
+            fs, _ = fsspec.core.url_to_fs(out_path)
+            unchanged = [
+                s
+                for s in sources
+                if manifest.get(layer_name(s)) == fingerprints[layer_name(s)]
+                and fs.exists(os.path.join(out_path, layer_name(s) + ".parquet"))
+            ]
+            for source in unchanged:
+                LOG.info(f"{source['alias']} unchanged, skipping")
+            sources = [s for s in sources if s not in unchanged]
+
+        host_limits = {
+            host: threading.BoundedSemaphore(host_workers)
+            for host in {source_host(s) for s in sources}
+        }
+        written = 0
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(
+                    cache_group,
+                    group,
+                    out_path,
+                    host_limits[source_host(group[0])],
+                    chunk_size,
+                    {
+                        "compression": compression,
+                        "compression_level": compression_level,
+                        "row_group_size": row_group_size,
+                    },
+                ): group
+                for group in source_groups(sources)
+            }
+            for future in as_completed(futures):
+                group = futures[future]
+                try:
+                    out_files = future.result()
+                except Exception:
+                    aliases = ", ".join(s["alias"] for s in group)
+                    LOG.error(f"{aliases} failed, cancelling remaining sources")
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    raise
+                for source, out_file in zip(group, out_files, strict=True):
+                    written += 1
+                    LOG.info(
+                        f"{source['alias']} written to {out_file} ({written}/{len(sources)})"
+                    )
+                    if incremental:
+                        manifest[layer_name(source)] = fingerprints[layer_name(source)]
+                    else:
+                        manifest.pop(layer_name(source), None)
+                # record progress as it's made, so a failed run can resume incrementally
+                write_manifest(out_path, manifest)
 
 
 @cli.command()
@@ -340,26 +1110,44 @@ def cache(sources_file, source_alias, dry_run, out_path, verbose, quiet):
 @verbose_opt
 @quiet_opt
 def clear_cache(path, dry_run, verbose, quiet):
-    """Delete cached parquet files written by cache (hr_*.parquet)"""
+    """Delete cached parquet files written by cache (hr_*.parquet, hr_manifest.json)"""
     configure_logging((verbose - quiet))
 
     if path.startswith("s3://"):
-        cmd = [
-            "aws",
-            "s3",
-            "rm",
-            path,
-            "--recursive",
-            "--exclude",
-            "*",
-            "--include",
-            "hr_*.parquet",
+        # list the files directly under the prefix (as the local glob), then delete them
+        # in batches of up to 1000 keys, the most delete_objects takes per request
+        bucket, _, prefix = path.removeprefix("s3://").partition("/")
+        prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+        paginator = s3_client().get_paginator("list_objects_v2")
+        keys = [
+            o["Key"]
+            for page in paginator.paginate(Bucket=bucket, Prefix=prefix, Delimiter="/")
+            for o in page.get("Contents", [])
+            if fnmatch.fnmatch(os.path.basename(o["Key"]), "hr_*.parquet")
+            or os.path.basename(o["Key"]) == CACHE_MANIFEST
         ]
-        if dry_run:
-            cmd.append("--dryrun")
-        subprocess.run(cmd, check=True)
+        for i in range(0, len(keys), 1000):
+            batch = keys[i : i + 1000]
+            if dry_run:
+                for key in batch:
+                    LOG.info(f"Would remove s3://{bucket}/{key}")
+                continue
+            response = s3_client().delete_objects(
+                Bucket=bucket,
+                Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+            )
+            errors = response.get("Errors", [])
+            if errors:
+                raise RuntimeError(
+                    f"Failed to remove {len(errors)} files from {path}, e.g. "
+                    f"{errors[0]['Key']}: {errors[0]['Message']}"
+                )
+            for key in batch:
+                LOG.info(f"Removed s3://{bucket}/{key}")
     else:
-        files = glob.glob(os.path.join(path, "hr_*.parquet"))
+        files = glob.glob(os.path.join(path, "hr_*.parquet")) + glob.glob(
+            os.path.join(path, CACHE_MANIFEST)
+        )
         for f in files:
             if dry_run:
                 LOG.info(f"Would remove {f}")
@@ -368,7 +1156,7 @@ def clear_cache(path, dry_run, verbose, quiet):
                 LOG.info(f"Removed {f}")
 
     verb = "Would clear" if dry_run else "Cleared"
-    LOG.info(f"{verb} cached source parquet files from {path}")
+    LOG.info(f"{verb} cached source parquet files and manifest from {path}")
 
 
 @cli.command()
@@ -404,6 +1192,18 @@ def clear_cache(path, dry_run, verbose, quiet):
     "previously loaded rows. No effect without --out_table, since each per-source table is "
     "already replaced fresh on every load.",
 )
+@click.option(
+    "--unlogged",
+    is_flag=True,
+    help="Load to UNLOGGED tables (faster, but not crash safe while loading), set LOGGED once indexed",
+)
+@click.option(
+    "--workers",
+    "-w",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of sources to load concurrently",
+)
 @click.option(
     "--dry_run", "-t", is_flag=True, help="Validate sources_file only, do not load data"
 )
@@ -416,6 +1216,8 @@ def load_db(
     out_table,
     source_alias,
     truncate,
+    unlogged,
+    workers,
     dry_run,
     verbose,
     quiet,
@@ -423,8 +1225,8 @@ def load_db(
     """Load source layers from parquet cache to the postgresql db"""
     configure_logging((verbose - quiet))
 
-    # connect to db
-    db = create_engine(db_url)
+    # connect to db, with a connection for each worker
+    db = create_engine(db_url, pool_size=workers)
 
     # load sources file
     with open(sources_file, "r") as f:
@@ -439,7 +1241,7 @@ def load_db(
 
     # only validate on dry-run
     if dry_run:
-        sources = validate_sources(sources)
+        sources = validate_sources(sources, workers=workers)
 
     else:
         if truncate:
@@ -450,20 +1252,54 @@ def load_db(
             elif not out_table:
                 LOG.warning("--truncate has no effect without --out_table")
 
-        for source in sources:
-            layer = (
-                "hr_" + str(source["index"]).zfill(2) + "_" + source["alias"].lower()
-            )
-            in_file = os.path.join(in_path, layer + ".parquet")
-            df = geopandas.read_parquet(in_file)
-            # if out_table specified, write to that table, appending if it exists
-            if out_table:
-                df.to_postgis(out_table, db, if_exists="append")
-                LOG.info(f"{source['alias']} written to {out_table}")
-            # if out_table not provided, write to table with the layer name, overwriting if it exists
-            else:
-                df.to_postgis(layer, db, if_exists="replace")
-                LOG.info(f"{source['alias']} written to {layer}")
+        # create out_table up front (if it does not exist), so concurrent loads all
+        # append to the same table
+        if out_table:
+            in_file = os.path.join(in_path, layer_name(sources[0]) + ".parquet")
+            with fsspec.open(in_file, "rb") as f:
+                schema = pyarrow.parquet.read_schema(f)
+            conn = db.raw_connection()
+            try:
+                with conn.cursor() as cursor:
+                    create_table(cursor, out_table, schema, unlogged=unlogged)
+                conn.commit()
+            finally:
+                conn.close()
+
+        # copy sources concurrently, any failure fails the whole load
+        tables = []
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(
+                    load_source, db, source, in_path, out_table, unlogged
+                ): source
+                for source in sources
+            }
+            for future in as_completed(futures):
+                try:
+                    table = future.result()
+                except Exception:
+                    LOG.error(
+                        f"{futures[future]['alias']} failed, cancelling remaining sources"
+                    )
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    raise
+                if table not in tables:
+                    tables.append(table)
+
+        # index and analyze once all data is loaded - and with --unlogged, make the
+        # tables crash safe again (writing them to the WAL once, rather than row by row)
+        conn = db.raw_connection()
+        try:
+            with conn.cursor() as cursor:
+                for table in tables:
+                    index_table(cursor, table)
+                    if unlogged:
+                        cursor.execute(f"ALTER TABLE {table} SET LOGGED")
+            conn.commit()
+        finally:
+            conn.close()
+        LOG.info(f"Indexed and analyzed {', '.join(tables)}")
 
 
 DUMP_SQL = """select
@@ -484,14 +1320,104 @@ DUMP_SQL = """select
   array_to_string(trim_array(all_harv_restrict_class_names, 1), ';') as all_harv_restrict_class_names,
   map_tile_250k,
   geom
-from harvest_restrictions
-where
-all_harv_restrict_class_ranks @> ARRAY[6] and
-all_harv_restrict_class_ranks != ARRAY[6]"""
+from {table}
+where designated_land"""
+
+# adjacent 250k tiles (sharing an edge or corner) that both hold overlay output
+SEAM_PAIRS_SQL = """select a.map_tile, b.map_tile
+from whse_basemapping.nts_250k_grid a
+inner join whse_basemapping.nts_250k_grid b
+on a.map_tile < b.map_tile and st_intersects(a.geom, b.geom)
+where a.map_tile in (select map_tile_250k from harvest_restrictions)
+and b.map_tile in (select map_tile_250k from harvest_restrictions)"""
+
+# exported rows of two adjacent tiles with identical designations, meeting at the seam
+SEAM_EDGES_SQL = """select a.harvest_restrictions_id, b.harvest_restrictions_id
+from harvest_restrictions a
+inner join harvest_restrictions b
+on (
+  a.all_land_desig_names,
+  a.all_land_desig_type_ranks,
+  a.all_land_desig_type_codes,
+  a.all_land_desig_type_names,
+  a.all_land_desig_primary_keys,
+  a.all_harv_restrict_class_ranks,
+  a.all_harv_restrict_class_names
+) = (
+  b.all_land_desig_names,
+  b.all_land_desig_type_ranks,
+  b.all_land_desig_type_codes,
+  b.all_land_desig_type_names,
+  b.all_land_desig_primary_keys,
+  b.all_harv_restrict_class_ranks,
+  b.all_harv_restrict_class_names
+)
+and st_intersects(a.geom, b.geom)
+where a.map_tile_250k = %(a)s
+and b.map_tile_250k = %(b)s
+and a.designated_land"""
+
+
+def connected_components(edges):
+    """group the nodes of edges (pairs of ids) into connected components, returning a dict of
+    node: component, with each component identified by its smallest node"""
+    parent = {}
+
+    def find(node):
+        parent.setdefault(node, node)
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for a, b in edges:
+        a, b = find(a), find(b)
+        if a != b:
+            parent[max(a, b)] = min(a, b)
+    return {node: find(node) for node in parent}
+
+
+def dissolve_seams(db):
+    """merge exported overlay rows with identical designations across adjacent 250k tiles,
+    writing harvest_restrictions_dissolved. Rows to merge are found one pair of adjacent
+    tiles at a time (keeping each query to the rows of two tiles), then each connected group
+    of rows is unioned"""
+    conn = db.raw_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(SEAM_PAIRS_SQL)
+            pairs = cursor.fetchall()
+            edges = []
+            for a, b in pairs:
+                cursor.execute(SEAM_EDGES_SQL, {"a": a, "b": b})
+                edges.extend(cursor.fetchall())
+            components = connected_components(edges)
+            cursor.execute(
+                "CREATE TEMPORARY TABLE seam_components "
+                "(harvest_restrictions_id integer primary key, component_id integer) "
+                "ON COMMIT DROP"
+            )
+            cursor.execute(
+                "INSERT INTO seam_components "
+                "SELECT unnest(%(ids)s::integer[]), unnest(%(components)s::integer[])",
+                {"ids": list(components), "components": list(components.values())},
+            )
+            cursor.execute(read_sql("sql/dissolve_seams.sql"))
+            cursor.execute("SELECT count(*) FROM harvest_restrictions_dissolved")
+            rows = cursor.fetchone()[0]
+        conn.commit()
+    finally:
+        conn.close()
+    LOG.info(
+        f"Dissolved seams of {len(pairs)} adjacent tile pairs, "
+        f"merging {len(components)} rows - {rows} rows in harvest_restrictions_dissolved"
+    )
 
 
-def export_overlay(db_url, out_file, out_format):
-    """export the overlay result table from postgres to out_file, in the given ogr2ogr format"""
+def export_overlay(db_url, out_file, out_format, dissolved=False):
+    """export the overlay result table from postgres to out_file, in the given ogr2ogr format -
+    per 250k tile, or with dissolved, as merged across tile seams (see dissolve_seams)"""
+    table = "harvest_restrictions_dissolved" if dissolved else "harvest_restrictions"
     subprocess.run(
         [
             "ogr2ogr",
@@ -504,12 +1430,480 @@ def export_overlay(db_url, out_file, out_format):
             "-nln",
             "harvest_restrictions",
             "-sql",
-            DUMP_SQL,
+            DUMP_SQL.format(table=table),
         ],
         check=True,
     )
 
 
+def read_sql(path, identifiers=None):
+    """read a sql file written for psql, converting its variables for execution with
+    psycopg2 - :'name' (a quoted literal) to query parameter %(name)s, and :name to the
+    value given in identifiers (substituted as is, so only for trusted values such as table
+    names)"""
+    with open(path) as f:
+        sql = f.read()
+    identifiers = identifiers or {}
+
+    def identifier(match):
+        if match.group(1) not in identifiers:
+            raise ValueError(
+                f"{path} - no value provided for variable :{match.group(1)}"
+            )
+        return identifiers[match.group(1)]
+
+    sql = sql.replace("%", "%%")
+    sql = re.sub(r":'(\w+)'", r"%(\1)s", sql)
+    return re.sub(r"(?<![:\w]):([A-Za-z_]\w*)", identifier, sql)
+
+
+OVERLAY_REPORT = "overlay_tiles.csv"
+
+# overlay sql for each available engine
+OVERLAY_ENGINES = {
+    "polygonize": "sql/overlay.sql",
+    "clustered": "sql/overlay_clustered.sql",
+}
+
+TILE_COST_SQL = """select
+  map_tile,
+  sum(st_npoints(geom)) as vertices
+from designations_tiled
+group by map_tile
+order by vertices desc"""
+
+# 50k tiles within a given 250k tile that hold designations
+TILE_CELLS_SQL = """select c.map_tile
+from whse_basemapping.nts_50k_grid c
+inner join whse_basemapping.nts_250k_grid t
+on st_intersects(st_pointonsurface(c.geom), t.geom)
+where t.map_tile = :tile
+and exists (
+  select 1
+  from designations_tiled d
+  where d.map_tile = t.map_tile
+  and st_intersects(d.geom, c.geom)
+)
+order by c.map_tile"""
+
+
+CLEAR_TILE_SQL = "DELETE FROM harvest_restrictions WHERE map_tile_250k = %(tile)s"
+
+# hash of each feature of designations_tiled, aggregated to a digest of the overlay inputs
+# of a tile - a tile with the same digest as a previous run has the same output
+TILE_FEATURE_HASH = "md5(row(index, alias, description, primary_key, name, harvest_restriction, geom)::text)"
+
+TILE_DIGEST_SQL = f"""select
+  map_tile,
+  md5(string_agg(feature, '' order by feature)) as digest
+from (
+  select map_tile, {TILE_FEATURE_HASH} as feature
+  from designations_tiled
+) as f
+group by map_tile"""
+
+TILE_DONE_SQL = f"""INSERT INTO harvest_restrictions_progress (map_tile, completed_at, digest)
+SELECT %(tile)s, now(), md5(string_agg(feature, '' ORDER BY feature))
+FROM (
+  SELECT {TILE_FEATURE_HASH} AS feature
+  FROM designations_tiled
+  WHERE map_tile = %(tile)s
+) AS f
+ON CONFLICT (map_tile) DO UPDATE
+SET completed_at = excluded.completed_at, digest = excluded.digest"""
+
+
+def overlay_tile(db, sql, tile, cell=None, retries=0, timeout=None, step="overlay"):
+    """run sql (the overlay, or a dissolve step) for a tile (or a 50k cell of a tile), in a
+    single transaction over a connection from the db engine's pool, retrying up to retries
+    times on database errors. Returns a report of the run (rows inserted, timing, attempts,
+    status) rather than raising
+
+    With timeout (seconds), a tile that takes longer is cancelled and reported with status
+    "timeout", without retrying - for splitting into cells instead
+
+    Overlaying a whole tile first deletes any output already written for it, and (as does
+    the dissolve of a split tile) records the tile as complete in
+    harvest_restrictions_progress - all in the same transaction, so a tile's output is
+    either complete or absent
+    """
+    attempt = 0
+    while True:
+        attempt += 1
+        start = time.perf_counter()
+        conn = db.raw_connection()
+        try:
+            with conn.cursor() as cursor:
+                if timeout:
+                    cursor.execute(
+                        "SET LOCAL statement_timeout = %(ms)s",
+                        {"ms": int(timeout * 1000)},
+                    )
+                if not cell and step == "overlay":
+                    cursor.execute(CLEAR_TILE_SQL, {"tile": tile})
+                cursor.execute(sql, {"tile": tile, "cell": cell})
+                rows = cursor.rowcount  # from the final insert
+                if not cell:
+                    cursor.execute(TILE_DONE_SQL, {"tile": tile})
+            conn.commit()
+            status = "ok"
+        except psycopg2.Error as e:
+            # discard the connection, retry on a fresh one
+            conn.invalidate()
+            rows = None
+            # query_canceled
+            if timeout and e.pgcode == "57014":
+                status = "timeout"
+            else:
+                status = f"failed: {e}".strip()
+        finally:
+            conn.close()
+        seconds = round(time.perf_counter() - start, 1)
+        if status in ("ok", "timeout") or attempt > retries:
+            return {
+                "map_tile": tile,
+                "cell": cell,
+                "step": step,
+                "status": status,
+                "attempts": attempt,
+                "seconds": seconds,
+                "rows": rows,
+            }
+        LOG.warning(f"{' '.join(filter(None, [tile, cell, step]))} {status}, retrying")
+
+
+def overlay_tiles(
+    db,
+    costs,
+    overlay_sql,
+    dissolve_sql,
+    jobs,
+    retries=0,
+    split_vertices=None,
+    tile_timeout=None,
+):
+    """overlay the given tiles ({map_tile: vertices}) in parallel over jobs workers, in the
+    given order. Tiles over split_vertices (or that run past tile_timeout) are split into
+    50k cells, each overlaid separately, then dissolved back together once all cells of
+    the tile are done. Returns a report row per tile/cell/step run
+    """
+    report = []
+    cells_remaining = {}
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {}
+
+        def split_tile(tile):
+            # clear output of any previous, incomplete run of the tile before its cells are
+            # written (the dissolve then replaces the cell outputs)
+            with db.begin() as conn:
+                conn.execute(
+                    text(
+                        "DELETE FROM harvest_restrictions WHERE map_tile_250k = :tile"
+                    ),
+                    {"tile": tile},
+                )
+                cells = conn.execute(text(TILE_CELLS_SQL), {"tile": tile}).scalars()
+                cells = list(cells)
+            # tiles with no 50k cells (shouldn't happen) are run whole, with no timeout
+            if not cells:
+                future = executor.submit(
+                    overlay_tile, db, overlay_sql, tile, None, retries
+                )
+                futures[future] = costs[tile]
+                return
+            cells_remaining[tile] = len(cells)
+            for cell in cells:
+                future = executor.submit(
+                    overlay_tile, db, overlay_sql, tile, cell, retries
+                )
+                futures[future] = costs[tile] // len(cells)
+
+        for tile, vertices in costs.items():
+            if split_vertices and vertices > split_vertices:
+                LOG.info(f"{tile} - {vertices} vertices, splitting into 50k tiles")
+                split_tile(tile)
+            else:
+                future = executor.submit(
+                    overlay_tile, db, overlay_sql, tile, None, retries, tile_timeout
+                )
+                futures[future] = vertices
+
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = dict(future.result(), vertices=futures.pop(future))
+                report.append(result)
+                tile = result["map_tile"]
+                label = " ".join(filter(None, [tile, result["cell"], result["step"]]))
+                LOG.info(
+                    f"{label} {result['status']} - {result['rows']} rows in {result['seconds']}s"
+                )
+                if result["status"] == "timeout":
+                    LOG.info(f"{tile} timed out, splitting into 50k tiles")
+                    split_tile(tile)
+                elif result["cell"]:
+                    cells_remaining[tile] -= 1
+                    if cells_remaining[tile] == 0:
+                        future = executor.submit(
+                            overlay_tile,
+                            db,
+                            dissolve_sql,
+                            tile,
+                            None,
+                            retries,
+                            step="dissolve",
+                        )
+                        futures[future] = costs[tile]
+    return report
+
+
+def write_overlay_report(report, out_file=OVERLAY_REPORT):
+    """write the per tile overlay report to csv (slowest first), and raise if any tile
+    failed
+    """
+    with open(out_file, "w", newline="") as f:
+        writer = csv.DictWriter(
+            f,
+            fieldnames=[
+                "map_tile",
+                "cell",
+                "step",
+                "vertices",
+                "status",
+                "attempts",
+                "seconds",
+                "rows",
+            ],
+        )
+        writer.writeheader()
+        writer.writerows(sorted(report, key=lambda r: -r["seconds"]))
+    LOG.info(f"Per tile overlay report written to {out_file}")
+    failed = [
+        " ".join(filter(None, [r["map_tile"], r["cell"], r["step"]]))
+        for r in report
+        if r["status"] not in ("ok", "timeout")
+    ]
+    if failed:
+        raise RuntimeError(f"Overlay failed for tiles: {', '.join(failed)}")
+
+
+# harvest restriction classes, as sql/setup.sql harvest_restriction_class_rank_name_xref
+HARVEST_RESTRICTION_CLASSES = {
+    1: "Protected",
+    2: "Prohibited",
+    3: "High Restricted",
+    4: "Medium Restricted",
+    5: "Low Restricted",
+    6: "No Special Restriction",
+}
+
+DESIGNATION_COLUMNS = [
+    "index",
+    "alias",
+    "description",
+    "primary_key",
+    "name",
+    "harvest_restriction",
+]
+
+
+def polygon_parts(geoms):
+    """dump an array of geometries to their (singlepart) polygons, returning the polygons
+    and the index of the geometry each came from - as st_dump, filtered to polygons"""
+    parts, index = shapely.get_parts(geoms, return_index=True)
+    while True:
+        multi = numpy.isin(shapely.get_type_id(parts), [4, 5, 6, 7])
+        if not multi.any():
+            break
+        sub_parts, sub_index = shapely.get_parts(parts[multi], return_index=True)
+        parts = numpy.concatenate([parts[~multi], sub_parts])
+        index = numpy.concatenate([index[~multi], index[multi][sub_index]])
+    keep = (shapely.get_type_id(parts) == 3) & ~shapely.is_empty(parts)
+    return parts[keep], index[keep]
+
+
+def overlay_tile_python(map_tile, tile, designations):
+    """overlay the designations intersecting a 250k tile (a shapely polygon) - as
+    sql/prepare.sql and sql/overlay.sql, with shapely. Returns rows in the schema of the
+    harvest_restrictions table (less harvest_restrictions_id)"""
+    # clean and clip to the tile
+    tile = shapely.set_precision(tile, 0.1)
+    geoms = shapely.make_valid(
+        shapely.set_precision(designations.geometry.to_numpy(), 0.1)
+    )
+    clip = ~shapely.covered_by(geoms, tile)
+    geoms[clip] = shapely.make_valid(
+        shapely.intersection(geoms[clip], tile, grid_size=0.1)
+    )
+    parts, index = polygon_parts(geoms)
+    cleaned = designations.iloc[index][DESIGNATION_COLUMNS].reset_index(drop=True)
+
+    # node the rings, polygonize, and find the designations containing each polygon
+    noded = shapely.union_all(shapely.get_rings(parts), grid_size=0.1)
+    faces = shapely.get_parts(shapely.polygonize(shapely.get_parts(noded)))
+    tree = shapely.STRtree(parts)
+    face_index, part_index = tree.query(
+        shapely.point_on_surface(faces), predicate="within"
+    )
+
+    # attributes of each face, sorted by index
+    attributes = cleaned.iloc[part_index].assign(face=face_index)
+    attributes = attributes[
+        attributes["harvest_restriction"].isin(list(HARVEST_RESTRICTION_CLASSES))
+    ]
+    attributes["harvest_restriction_class_name"] = attributes[
+        "harvest_restriction"
+    ].map(HARVEST_RESTRICTION_CLASSES)
+    attributes = attributes.sort_values(["face", "index", "primary_key"], kind="stable")
+    columns = [*DESIGNATION_COLUMNS, "harvest_restriction_class_name"]
+    attributes[columns] = (
+        attributes[columns].astype(object).where(attributes[columns].notna(), None)
+    )
+    aggregated = attributes.groupby("face")[columns].agg(tuple)
+
+    # union faces with the same designations
+    rows = []
+    for key, group in aggregated.groupby(columns):
+        index, alias, description, primary_key, name, restriction, class_name = key
+        rows.append(
+            {
+                "land_designation_name": name[0],
+                "land_designation_type_rank": index[0],
+                "land_designation_type_code": alias[0],
+                "land_designation_type_name": description[0],
+                "land_designation_primary_key": primary_key[0],
+                "harvest_restriction_class_rank": restriction[0],
+                "harvest_restriction_class_name": class_name[0],
+                "all_land_desig_names": list(name),
+                "all_land_desig_type_ranks": [str(i) for i in index],
+                "all_land_desig_type_codes": list(alias),
+                "all_land_desig_type_names": list(description),
+                "all_land_desig_primary_keys": list(primary_key),
+                "all_harv_restrict_class_ranks": list(restriction),
+                "all_harv_restrict_class_names": list(class_name),
+                "map_tile_250k": map_tile,
+                "geom": shapely.multipolygons(
+                    shapely.get_parts(
+                        shapely.union_all(faces[group.index], grid_size=0.1)
+                    )
+                ),
+            }
+        )
+    return rows
+
+
+def overlay_python(designations, grid, jobs=None):
+    """overlay designations (a geodataframe, as loaded by load-db) per 250k tile of grid, in
+    a pool of jobs processes, most expensive tiles (by vertex count) first. Returns a
+    geodataframe in the schema of the harvest_restrictions table"""
+    designations = designations.reset_index(drop=True)
+    tree = shapely.STRtree(designations.geometry.to_numpy())
+    vertices = shapely.get_num_coordinates(designations.geometry.to_numpy())
+    tiles = []
+    for map_tile, tile in zip(grid["map_tile"], grid.geometry, strict=True):
+        index = tree.query(tile, predicate="intersects")
+        if len(index):
+            tiles.append((vertices[index].sum(), map_tile, tile, index))
+    rows = []
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(
+                overlay_tile_python, map_tile, tile, designations.iloc[index]
+            ): map_tile
+            for _, map_tile, tile, index in sorted(tiles, key=lambda t: -t[0])
+        }
+        for future in as_completed(futures):
+            rows.extend(future.result())
+            LOG.info(f"{futures[future]} overlay complete")
+    df = geopandas.GeoDataFrame(rows, geometry="geom", crs="EPSG:3005")
+    df.insert(0, "harvest_restrictions_id", range(1, len(df.index) + 1))
+    # as the generated columns of the database output table
+    ranks = df["all_harv_restrict_class_ranks"]
+    df.insert(len(df.columns) - 1, "area_ha", df.area / 10000)
+    df.insert(
+        len(df.columns) - 1,
+        "designated_land",
+        ranks.map(lambda r: 6 in r and r != [6]).astype(bool),
+    )
+    return df
+
+
+def dump_overlay(df):
+    """the overlay output as exported (see DUMP_SQL) - land area only, with array columns
+    (less the final, land, element) as ; separated strings"""
+    df = df[df["designated_land"]].drop(columns=["area_ha", "designated_land"])
+    for column in [c for c in df.columns if c.startswith("all_")]:
+        df[column] = df[column].map(
+            lambda values: ";".join("" if v is None else str(v) for v in values[:-1])
+        )
+    return df
+
+
+def summarize_overlay(df):
+    """area (ha) totals of the overlay output (land area only) per land designation, and
+    per harvest restriction class. df is the overlay output, or its area already totalled
+    per land designation (as sql/summary.sql) - either way, both summaries are rolled up
+    from a single per land designation total, rounding only at the end"""
+    columns = [
+        "harvest_restriction_class_rank",
+        "harvest_restriction_class_name",
+        "land_designation_type_rank",
+        "land_designation_type_code",
+        "land_designation_type_name",
+    ]
+    if "designated_land" in df.columns:
+        df = df[df["designated_land"]]
+    land_designations = df.groupby(columns, as_index=False, dropna=False)[
+        "area_ha"
+    ].sum()
+    summaries = []
+    for summary in [
+        land_designations,
+        land_designations.groupby(columns[:2], as_index=False)["area_ha"].sum(),
+    ]:
+        # round half away from zero, as postgres
+        summary["area_ha"] = numpy.floor(summary["area_ha"] + 0.5).astype(int)
+        summaries.append(summary)
+    return summaries
+
+
+def overlay_cached(in_path, out_file, sources_file, jobs=None):
+    """overlay the cached sources (at in_path, local or s3://) with the python engine,
+    writing the output to out_file (plus a geoparquet alongside, with array columns),
+    source designations to sources_file, and summaries to csv - as the database engines
+    do, but without a database"""
+    with open("sources.json") as f:
+        sources = parse_sources(json.load(f))
+    designations = pandas.concat(
+        [
+            geopandas.read_parquet(
+                os.path.join(in_path, layer_name(source) + ".parquet")
+            )
+            for source in sources
+        ],
+        ignore_index=True,
+    )
+    grid = bcdata.get_data(
+        "WHSE_BASEMAPPING.NTS_250K_GRID", as_gdf=True, lowercase=True
+    )
+    df = overlay_python(designations, grid, jobs)
+
+    # write results, and source designations, to geopackage
+    dump_overlay(df).to_file(out_file, layer="harvest_restrictions", driver="GPKG")
+    LOG.info(f"Overlay results written to {out_file}")
+    # plus the full output table (with array columns), as geoparquet
+    out_parquet = os.path.splitext(out_file)[0] + ".parquet"
+    df.to_parquet(out_parquet)
+    LOG.info(f"Overlay results written to {out_parquet}")
+    designations.to_file(sources_file, layer="designations", driver="GPKG")
+    LOG.info(f"designations written to {sources_file}")
+
+    # summarize results
+    land_designations, harvest_restrictions = summarize_overlay(df)
+    land_designations.to_csv(LAND_DESIGNATIONS, index=False)
+    harvest_restrictions.to_csv(HARVEST_RESTRICTIONS, index=False)
+
+
 def s3_key(key):
     return f"harvest_restrictions/{key}"
 
@@ -524,48 +1918,202 @@ def draft_key(name):
     return f"draft/{name}"
 
 
+@functools.cache
+def s3_client():
+    """the boto3 s3 client shared by all s3 helpers (and threads) for the life of the process,
+    reusing its pool of keep-alive connections rather than connecting per request
+
+    Configured as the aws cli, from the environment ($AWS_ENDPOINT_URL etc)
+    """
+    return boto3.client("s3", config=Config(max_pool_connections=64))
+
+
+def version_args(version_id=None):
+    """VersionId argument for s3 requests on a specific object version, if given"""
+    return {"VersionId": version_id} if version_id else {}
+
+
 def s3_get_tags(bucket, key, version_id=None):
     """return the tags currently set on an s3 object, optionally a specific version, as a dict"""
-    cmd = [
-        "aws",
-        "s3api",
-        "get-object-tagging",
-        "--bucket",
-        bucket,
-        "--key",
-        s3_key(key),
-    ]
-    if version_id:
-        cmd += ["--version-id", version_id]
-    out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
-    return {t["Key"]: t["Value"] for t in json.loads(out)["TagSet"]}
+    response = s3_client().get_object_tagging(
+        Bucket=bucket, Key=s3_key(key), **version_args(version_id)
+    )
+    return {t["Key"]: t["Value"] for t in response["TagSet"]}
 
 
 def s3_put_tags(bucket, key, tags, version_id=None):
     """replace the full tag set on an s3 object, optionally a specific version"""
-    tagging = {"TagSet": [{"Key": k, "Value": v} for k, v in tags.items()]}
-    cmd = [
-        "aws",
-        "s3api",
-        "put-object-tagging",
-        "--bucket",
-        bucket,
-        "--key",
-        s3_key(key),
-        "--tagging",
-        json.dumps(tagging),
-    ]
+    s3_client().put_object_tagging(
+        Bucket=bucket,
+        Key=s3_key(key),
+        Tagging={"TagSet": [{"Key": k, "Value": v} for k, v in tags.items()]},
+        **version_args(version_id),
+    )
+
+
+def manifest_key(key):
+    """key of the version manifest of an s3 object - a json list of the id and tags of each
+    version uploaded by s3_upload_and_tag, most recent first
+
+    The manifest is updated by read-modify-write, so assumes a single writer per key at a
+    time (one overlay or release run per bucket). An entry lost to concurrent writers is
+    still found by s3_find_version (falling back to listing versions, which also rewrites the
+    manifest - dropping entries for versions that no longer exist)
+    """
+    return f"versions/{key}.json"
+
+
+def s3_read_manifest(bucket, key):
+    """return the version manifest of an s3 object, or None if there is none"""
+    try:
+        response = s3_client().get_object(Bucket=bucket, Key=s3_key(manifest_key(key)))
+    except ClientError as e:
+        if e.response["Error"]["Code"] in ("404", "NoSuchKey"):
+            return None
+        raise
+    return json.loads(response["Body"].read())
+
+
+def s3_write_manifest(bucket, key, manifest):
+    s3_client().put_object(
+        Bucket=bucket,
+        Key=s3_key(manifest_key(key)),
+        Body=json.dumps(manifest).encode("utf-8"),
+        ContentType="application/json",
+    )
+
+
+def s3_put_fileobj(bucket, f, key, tags, part_size=64, concurrency=8):
+    """upload file object f to object storage, tagged as uploaded (so no version is ever
+    untagged), returning the id of the version written (None on an unversioned bucket)
+
+    Files larger than part_size (MB) are uploaded in parts, concurrency parts at a time - read
+    from f in order, so f need not be seekable (at most concurrency parts are held in memory)
+    """
+    part_bytes = part_size * 1024 * 1024
+    tagging = urllib.parse.urlencode(tags)
+    body = f.read(part_bytes)
+    next_body = f.read(part_bytes)
+    if not next_body:
+        response = s3_client().put_object(
+            Bucket=bucket, Key=s3_key(key), Body=body, Tagging=tagging
+        )
+        return response.get("VersionId")
+
+    upload_id = s3_client().create_multipart_upload(
+        Bucket=bucket, Key=s3_key(key), Tagging=tagging
+    )["UploadId"]
+
+    def upload_part(number, body):
+        response = s3_client().upload_part(
+            Bucket=bucket,
+            Key=s3_key(key),
+            UploadId=upload_id,
+            PartNumber=number,
+            Body=body,
+        )
+        return {"PartNumber": number, "ETag": response["ETag"]}
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            pending = set()
+            parts = []
+            number = 0
+            while body:
+                number += 1
+                pending.add(executor.submit(upload_part, number, body))
+                if len(pending) >= concurrency:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    parts.extend(future.result() for future in done)
+                body, next_body = next_body, f.read(part_bytes) if next_body else b""
+            parts.extend(future.result() for future in pending)
+        response = s3_client().complete_multipart_upload(
+            Bucket=bucket,
+            Key=s3_key(key),
+            UploadId=upload_id,
+            MultipartUpload={"Parts": sorted(parts, key=lambda p: p["PartNumber"])},
+        )
+    except BaseException:
+        s3_client().abort_multipart_upload(
+            Bucket=bucket, Key=s3_key(key), UploadId=upload_id
+        )
+        raise
+    return response.get("VersionId")
+
+
+def s3_upload_and_tag(bucket, local_file, key, tags, part_size=64, concurrency=8):
+    """upload local_file to object storage, tagged as uploaded, and record the version
+    written (as returned by the upload itself) in the object's version manifest"""
+    with open(local_file, "rb") as f:
+        version_id = s3_put_fileobj(bucket, f, key, tags, part_size, concurrency)
+    s3_record_version(bucket, key, version_id, tags)
+
+
+def s3_record_version(bucket, key, version_id, tags):
+    """add a new version of an s3 object to its version manifest (none is kept on an
+    unversioned bucket, where version_id is None)"""
     if version_id:
-        cmd += ["--version-id", version_id]
-    subprocess.run(cmd, check=True)
+        manifest = s3_read_manifest(bucket, key) or []
+        s3_write_manifest(
+            bucket, key, [{"version_id": version_id, "tags": tags}, *manifest]
+        )
 
 
-def s3_upload_and_tag(bucket, local_file, key, tags):
-    """upload local_file to object storage, tagging the resulting object version"""
-    subprocess.run(
-        ["aws", "s3", "cp", local_file, f"s3://{bucket}/{s3_key(key)}"], check=True
+def s3_copy_version(bucket, source_key, version_id, key, tags):
+    """copy a version of an s3 object to key server side (no download/upload), tagging the
+    copy with tags rather than the source's tags"""
+    response = s3_client().copy_object(
+        Bucket=bucket,
+        Key=s3_key(key),
+        CopySource={
+            "Bucket": bucket,
+            "Key": s3_key(source_key),
+            **version_args(version_id),
+        },
+        Tagging=urllib.parse.urlencode(tags),
+        TaggingDirective="REPLACE",
     )
-    s3_put_tags(bucket, key, tags)
+    s3_record_version(bucket, key, response.get("VersionId"), tags)
+
+
+def s3_publish(
+    bucket, tags, uploads=(), copies=(), unzips=(), part_size=64, concurrency=8
+):
+    """publish everything given concurrently, all tagged with tags - uploading
+    (local_file, key) uploads (in parts of part_size MB, concurrency parts at a time), and
+    copying server side / streaming unzipped (draft key, version id, key) copies / unzips.
+    Raises (once all are done) if anything failed"""
+    tasks = {}
+    for local_file, key in uploads:
+        tasks[f"{local_file} upload to s3://{bucket}/{s3_key(key)}"] = (
+            s3_upload_and_tag,
+            (bucket, local_file, key, tags, part_size, concurrency),
+        )
+    for draft, version_id, key in copies:
+        tasks[f"s3://{bucket}/{s3_key(draft)} copy to s3://{bucket}/{s3_key(key)}"] = (
+            s3_copy_version,
+            (bucket, draft, version_id, key, tags),
+        )
+    for draft, version_id, key in unzips:
+        tasks[f"s3://{bucket}/{s3_key(draft)} unzip to s3://{bucket}/{s3_key(key)}"] = (
+            s3_unzip_version,
+            (bucket, draft, version_id, key, tags, part_size, concurrency),
+        )
+    failed = []
+    with ThreadPoolExecutor(max_workers=len(tasks) or 1) as executor:
+        futures = {
+            executor.submit(function, *args): task
+            for task, (function, args) in tasks.items()
+        }
+        for future in as_completed(futures):
+            try:
+                future.result()
+                LOG.info(f"{futures[future]} complete")
+            except (BotoCoreError, ClientError, OSError, zipfile.BadZipFile) as e:
+                LOG.error(f"{futures[future]} failed: {e}")
+                failed.append(futures[future])
+    if failed:
+        raise RuntimeError(f"Publishing failed: {'; '.join(failed)}")
 
 
 def s3_delete(bucket, key):
@@ -575,7 +2123,26 @@ def s3_delete(bucket, key):
     erasing history - prior versions (including whatever release() just read) stay retrievable
     by version id, same as any other noncurrent version, subject to the bucket's lifecycle policy.
     """
-    subprocess.run(["aws", "s3", "rm", f"s3://{bucket}/{s3_key(key)}"], check=True)
+    s3_client().delete_object(Bucket=bucket, Key=s3_key(key))
+
+
+def tags_match(version_tags, tags):
+    """True if version_tags has all tags - a tag value of None matching any value"""
+    return all(
+        k in version_tags and (expected is None or version_tags[k] == expected)
+        for k, expected in tags.items()
+    )
+
+
+def s3_version_tags(bucket, key, version_id):
+    """tags of a version of an s3 object, or None if the version no longer exists (e.g.
+    expired by lifecycle policy)"""
+    try:
+        return s3_get_tags(bucket, key, version_id)
+    except ClientError as e:
+        if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NoSuchVersion"):
+            return None
+        raise
 
 
 def s3_find_version(bucket, key, **tags):
@@ -585,60 +2152,128 @@ def s3_find_version(bucket, key, **tags):
     s3_find_version(bucket, key, commit=sha, run_id=None) requires a specific commit but
     accepts any run_id, while s3_find_version(bucket, key, commit=sha, run_id=rid) pins both.
 
+    Versions are looked up in the object's version manifest, and the tags of the version
+    found confirmed on the object itself (two requests, however many versions there are).
+    Objects with no manifest (uploaded before manifests were written), or with no matching
+    version in it, fall back to listing all versions and fetching their tags concurrently -
+    rewriting the manifest from the listing.
+
     returns (version_id, tags) for the first (most recent) match, or (None, None)
     """
-    out = subprocess.run(
-        [
-            "aws",
-            "s3api",
-            "list-object-versions",
-            "--bucket",
-            bucket,
-            "--prefix",
-            s3_key(key),
-        ],
-        check=True,
-        capture_output=True,
-        text=True,
-    ).stdout
+    manifest = s3_read_manifest(bucket, key)
+    for v in manifest or []:
+        if tags_match(v["tags"], tags):
+            version_tags = s3_version_tags(bucket, key, v["version_id"])
+            if version_tags is not None and tags_match(version_tags, tags):
+                return v["version_id"], version_tags
+
+    paginator = s3_client().get_paginator("list_object_versions")
     versions = [
-        v for v in json.loads(out).get("Versions", []) if v["Key"] == s3_key(key)
+        v
+        for page in paginator.paginate(Bucket=bucket, Prefix=s3_key(key))
+        for v in page.get("Versions", [])
+        if v["Key"] == s3_key(key)
     ]
     versions.sort(key=lambda v: v["LastModified"], reverse=True)
-    for v in versions:
-        version_tags = s3_get_tags(bucket, key, v["VersionId"])
-        if all(
-            k in version_tags and (expected is None or version_tags[k] == expected)
-            for k, expected in tags.items()
-        ):
-            return v["VersionId"], version_tags
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        version_tags = list(
+            executor.map(lambda v: s3_get_tags(bucket, key, v["VersionId"]), versions)
+        )
+    if versions:
+        s3_write_manifest(
+            bucket,
+            key,
+            [
+                {"version_id": v["VersionId"], "tags": t}
+                for v, t in zip(versions, version_tags, strict=True)
+            ],
+        )
+    for v, t in zip(versions, version_tags, strict=True):
+        if tags_match(t, tags):
+            return v["VersionId"], t
     return None, None
 
 
 def s3_download_version(bucket, key, version_id, local_file):
-    subprocess.run(
-        [
-            "aws",
-            "s3api",
-            "get-object",
-            "--bucket",
-            bucket,
-            "--key",
-            s3_key(key),
-            "--version-id",
-            version_id,
-            local_file,
-        ],
-        check=True,
+    s3_client().download_file(
+        bucket, s3_key(key), local_file, ExtraArgs=version_args(version_id)
     )
 
 
-def s3_download_tagged(bucket, key, tag_filter, local_file=None):
-    """download the most recent version of an s3 object matching tag_filter to local_file
+class S3VersionReader(io.RawIOBase):
+    """seekable, read only file object over a version of an s3 object, reading only the
+    byte ranges requested - e.g. to read one file of a zip archive without downloading the
+    rest (wrap in io.BufferedReader, to read in large ranges)"""
+
+    def __init__(self, bucket, key, version_id=None):
+        self.bucket = bucket
+        self.key = key
+        self.version_id = version_id
+        self.size = s3_client().head_object(
+            Bucket=bucket, Key=s3_key(key), **version_args(version_id)
+        )["ContentLength"]
+        self.position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        start = {io.SEEK_SET: 0, io.SEEK_CUR: self.position, io.SEEK_END: self.size}
+        self.position = start[whence] + offset
+        return self.position
+
+    def readinto(self, b):
+        if self.position >= self.size or not len(b):
+            return 0
+        end = min(self.position + len(b), self.size) - 1
+        data = (
+            s3_client()
+            .get_object(
+                Bucket=self.bucket,
+                Key=s3_key(self.key),
+                Range=f"bytes={self.position}-{end}",
+                **version_args(self.version_id),
+            )["Body"]
+            .read()
+        )
+        b[: len(data)] = data
+        self.position += len(data)
+        return len(data)
+
+
+def s3_presigned_url(bucket, key, version_id=None, expires=6 * 60 * 60):
+    """presigned https url of a version of an s3 object, valid for expires seconds - for
+    reading specific versions with GDAL (/vsicurl/), which /vsis3/ does not support"""
+    return s3_client().generate_presigned_url(
+        "get_object",
+        Params={"Bucket": bucket, "Key": s3_key(key), **version_args(version_id)},
+        ExpiresIn=expires,
+    )
 
-    Raises if no matching version is found. local_file defaults to key's basename.
-    """
-    local_file = local_file or os.path.basename(key)
+
+def s3_unzip_version(
+    bucket, zip_key, version_id, key, tags, part_size=64, concurrency=8
+):
+    """upload the single file zip_file() compressed into a version of zip_key to key,
+    tagged, streaming from object to object rather than through local files"""
+    member = os.path.basename(os.path.splitext(zip_key)[0])
+    reader = io.BufferedReader(
+        S3VersionReader(bucket, zip_key, version_id), buffer_size=16 * 1024 * 1024
+    )
+    with zipfile.ZipFile(reader) as z, z.open(member) as f:
+        version_id = s3_put_fileobj(bucket, f, key, tags, part_size, concurrency)
+    s3_record_version(bucket, key, version_id, tags)
+
+
+def s3_tagged_version(bucket, key, tag_filter):
+    """id of the most recent version of an s3 object matching tag_filter, raising if no
+    matching version is found"""
     version_id, _ = s3_find_version(bucket, key, **tag_filter)
     if not version_id:
         tag_desc = ", ".join(f"{k}={v}" for k, v in tag_filter.items() if v)
@@ -646,19 +2281,69 @@ def s3_download_tagged(bucket, key, tag_filter, local_file=None):
             f"No s3://{bucket}/{s3_key(key)} object tagged {tag_desc} found - "
             "run overlay against this commit before releasing it"
         )
+    return version_id
+
+
+def s3_download_tagged(bucket, key, tag_filter, local_file=None):
+    """download the most recent version of an s3 object matching tag_filter to local_file
+
+    Raises if no matching version is found. local_file defaults to key's basename.
+    """
+    local_file = local_file or os.path.basename(key)
+    version_id = s3_tagged_version(bucket, key, tag_filter)
     s3_download_version(bucket, key, version_id, local_file)
     return local_file
 
 
-def add_gpkg_layer(out_file, source_file, layer_name, spatial=True):
-    """add source_file as a new layer (or non-spatial table) in out_file, creating it if needed"""
-    cmd = ["ogr2ogr", "-f", "GPKG"]
-    if os.path.exists(out_file):
-        cmd.append("-update")
-    cmd += [out_file, source_file, "-nln", layer_name]
-    if not spatial:
-        cmd += ["-nlt", "NONE", "-oo", "AUTODETECT_TYPE=YES"]
-    subprocess.run(cmd, check=True)
+def release_vrt(layers):
+    """OGR VRT xml of layers, a list of (layer name, source datasource, source layer) - with
+    no source layer, the datasource is a csv, read as a non-spatial table"""
+    root = ET.Element("OGRVRTDataSource")
+    for layer_name, source, source_layer in layers:
+        layer = ET.SubElement(root, "OGRVRTLayer", name=layer_name)
+        ET.SubElement(layer, "SrcDataSource").text = source
+        if source_layer:
+            ET.SubElement(layer, "SrcLayer").text = source_layer
+        else:
+            ET.SubElement(layer, "SrcLayer").text = os.path.splitext(
+                os.path.basename(source)
+            )[0]
+            open_options = ET.SubElement(layer, "OpenOptions")
+            ET.SubElement(open_options, "OOI", key="AUTODETECT_TYPE").text = "YES"
+            ET.SubElement(layer, "GeometryType").text = "wkbNone"
+    return ET.tostring(root, encoding="unicode")
+
+
+def write_release_gpkg(out_file, layers):
+    """write all layers (as release_vrt) to a new geopackage out_file in a single ogr2ogr
+    pass - the geopackage is opened once, and written in a single transaction, with spatial
+    indexes built once each layer is written. Sources may be remote (/vsicurl/ presigned
+    urls), read in place"""
+    vrt_file = os.path.splitext(out_file)[0] + ".vrt"
+    with open(vrt_file, "w") as f:
+        f.write(release_vrt(layers))
+    subprocess.run(
+        [
+            "ogr2ogr",
+            "-f",
+            "GPKG",
+            "-overwrite",
+            "-ds_transaction",
+            "-gt",
+            "unlimited",
+            # presigned urls are signed for GET only
+            "--config",
+            "CPL_VSIL_CURL_USE_HEAD",
+            "NO",
+            "--config",
+            "OGR_SQLITE_CACHE",
+            "512",
+            out_file,
+            vrt_file,
+        ],
+        check=True,
+    )
+    os.remove(vrt_file)
 
 
 def zip_file(local_file):
@@ -675,9 +2360,10 @@ def zip_file(local_file):
     return out_zip
 
 
-def vsizip_path(local_zip):
-    """GDAL /vsizip/ path to the single file zip_file() compressed into local_zip"""
-    return f"/vsizip/{local_zip}/{os.path.splitext(local_zip)[0]}"
+def vsizip_path(archive, member):
+    """GDAL /vsizip/ path to member of zip archive (a local path, or any GDAL virtual path,
+    e.g. /vsicurl/)"""
+    return f"/vsizip/{{{archive}}}/{member}"
 
 
 def s3_download_current(bucket, key, local_file):
@@ -685,12 +2371,13 @@ def s3_download_current(bucket, key, local_file):
 
     returns True if the object exists and was downloaded, False otherwise
     """
-    result = subprocess.run(
-        ["aws", "s3", "cp", f"s3://{bucket}/{s3_key(key)}", local_file],
-        capture_output=True,
-        text=True,
-    )
-    return result.returncode == 0
+    try:
+        s3_client().download_file(bucket, s3_key(key), local_file)
+    except ClientError as e:
+        if e.response["Error"]["Code"] in ("404", "NoSuchKey"):
+            return False
+        raise
+    return True
 
 
 D_COLUMNS = [
@@ -854,13 +2541,102 @@ def log(bucket):
     default=os.environ.get("BUCKET"),
     help="Object storage bucket to write outputs, defaults to $BUCKET environment variable if set",
 )
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=os.cpu_count(),
+    help="Number of tiles to overlay concurrently, defaults to the number of cpus",
+)
+@click.option(
+    "--retries",
+    type=click.IntRange(min=0),
+    default=2,
+    help="Number of times to retry a failed tile",
+)
+@click.option(
+    "--split_vertices",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Split 250k tiles with more than this many designation vertices into 50k tiles",
+)
+@click.option(
+    "--tile_timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+    help="Split 250k tiles that take longer than this many seconds into 50k tiles",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Resume a failed overlay run, skipping tiles already completed",
+)
+@click.option(
+    "--incremental",
+    "-i",
+    is_flag=True,
+    help="Overlay only tiles whose designations have changed since the last run, keeping existing output for the rest",
+)
+@click.option(
+    "--engine",
+    type=click.Choice([*OVERLAY_ENGINES, "python"]),
+    default="polygonize",
+    help="Overlay engine - polygonize noded rings of all designations in a tile at once, per cluster of interacting designations, or (python) without a database, from the cache",
+)
+@click.option(
+    "--dissolve",
+    is_flag=True,
+    help="Export output dissolved across 250k tile seams, rather than per tile (database engines only)",
+)
+@click.option(
+    "--in_path",
+    "-p",
+    type=click.Path(),
+    default=".",
+    help="With --engine python, path to read cached sources (local or s3://)",
+)
+@part_size_opt
+@upload_concurrency_opt
 @verbose_opt
 @quiet_opt
-def overlay(db_url, out_file, designations_table, bucket, verbose, quiet):
+def overlay(
+    db_url,
+    out_file,
+    designations_table,
+    bucket,
+    jobs,
+    retries,
+    split_vertices,
+    tile_timeout,
+    resume,
+    incremental,
+    engine,
+    dissolve,
+    in_path,
+    part_size,
+    upload_concurrency,
+    verbose,
+    quiet,
+):
     """Run per-tile overlay and write output and rollup/summaries to object storage"""
     configure_logging((verbose - quiet))
 
-    if not db_url:
+    if engine == "python":
+        # options of the database engines only
+        ctx = click.get_current_context()
+        for option in [
+            "designations_table",
+            "split_vertices",
+            "tile_timeout",
+            "resume",
+            "incremental",
+            "dissolve",
+        ]:
+            if ctx.get_parameter_source(option) != ParameterSource.DEFAULT:
+                raise click.UsageError(
+                    f"--{option} is not supported with --engine python"
+                )
+    elif not db_url:
         raise ValueError(
             "Target database url not provided, set --db_url or $DATABASE_URL"
         )
@@ -874,37 +2650,123 @@ def overlay(db_url, out_file, designations_table, bucket, verbose, quiet):
     )
     run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
 
-    psql = f"psql {db_url} -v ON_ERROR_STOP=1"
-
-    # load 250k grid
-    run("bcdata bc2pg WHSE_BASEMAPPING.NTS_250K_GRID")
-
-    # clear any existing data from output table
-    run(f'{psql} -c "TRUNCATE harvest_restrictions"')
-
-    # run overlays in parallel per tile
-    run(
-        f'{psql} -tXA -c "SELECT DISTINCT map_tile '
-        "FROM whse_basemapping.nts_250k_grid "
-        'ORDER BY map_tile" '
-        f"| parallel --tag {psql} -f sql/overlay.sql -v tile={{1}}"
-    )
-
-    # dump result to geopackage
-    export_overlay(db_url, out_file, "GPKG")
-    LOG.info(f"Overlay results written to {out_file}")
-
-    # dump source designations table to geopackage
     sources_file = "harvest_restrictions_sources.gpkg"
-    subprocess.run(
-        ["ogr2ogr", "-f", "GPKG", sources_file, f"PG:{db_url}", designations_table],
-        check=True,
-    )
-    LOG.info(f"{designations_table} written to {sources_file}")
+    if engine == "python":
+        # overlay cached sources directly, no database required
+        overlay_cached(in_path, out_file, sources_file, jobs)
+    else:
+        psql = f"psql {db_url} -v ON_ERROR_STOP=1"
+
+        # load 250k and 50k grids
+        run("bcdata bc2pg WHSE_BASEMAPPING.NTS_250K_GRID")
+        run("bcdata bc2pg WHSE_BASEMAPPING.NTS_50K_GRID")
+
+        db = create_engine(db_url, pool_size=jobs)
+
+        # bring tables of databases created before the current sql/setup.sql up to date
+        run(f"{psql} -f sql/migrate.sql")
+
+        # clean and tile the designations once, for all tiles to select from (when resuming,
+        # only if not already done)
+        if not resume or not inspect(db).has_table("designations_tiled"):
+            run(f"{psql} -f sql/prepare.sql")
+
+        # clear any existing data from output table - or if resuming, find tiles already done,
+        # or if running incrementally, tiles with unchanged inputs since they were last done
+        with db.begin() as conn:
+            if resume:
+                completed = set(
+                    conn.execute(
+                        text("SELECT map_tile FROM harvest_restrictions_progress")
+                    ).scalars()
+                )
+            elif incremental:
+                previous = dict(
+                    conn.execute(
+                        text(
+                            "SELECT map_tile, digest FROM harvest_restrictions_progress"
+                        )
+                    ).all()
+                )
+                current = dict(conn.execute(text(TILE_DIGEST_SQL)).all())
+                completed = {t for t, d in current.items() if previous.get(t) == d}
+                # remove output of tiles no longer holding any designations
+                removed = [t for t in previous if t not in current]
+                for table, column in [
+                    ("harvest_restrictions", "map_tile_250k"),
+                    ("harvest_restrictions_progress", "map_tile"),
+                ]:
+                    conn.execute(
+                        text(f"DELETE FROM {table} WHERE {column} = ANY(:tiles)"),
+                        {"tiles": removed},
+                    )
+                LOG.info(
+                    f"Incremental overlay - {len(current) - len(completed)} tiles changed, "
+                    f"{len(removed)} removed"
+                )
+            else:
+                conn.execute(
+                    text("TRUNCATE harvest_restrictions, harvest_restrictions_progress")
+                )
+                completed = set()
+
+        # run overlays in parallel per tile, most expensive (by designation vertex count)
+        # first, so the slowest tiles don't hold up the end of the run. Tiles over
+        # --split_vertices (or over --tile_timeout) are split into 50k cells, each overlaid
+        # separately, then dissolved back together once all cells of the tile are done
+        with db.connect() as conn:
+            costs = dict(conn.execute(text(TILE_COST_SQL)).all())
+        if completed:
+            LOG.info(f"Skipping {len(completed & set(costs))} completed tiles")
+            costs = {k: v for k, v in costs.items() if k not in completed}
+        overlay_sql = read_sql(OVERLAY_ENGINES[engine])
+        dissolve_sql = read_sql("sql/dissolve.sql")
+        report = overlay_tiles(
+            db,
+            costs,
+            overlay_sql,
+            dissolve_sql,
+            jobs,
+            retries,
+            split_vertices,
+            tile_timeout,
+        )
+        write_overlay_report(report)
+
+        # index the output and update its statistics, for export and summary
+        run(f"{psql} -f sql/index.sql")
+
+        # optionally merge output across tile seams, then dump result to geopackage
+        if dissolve:
+            dissolve_seams(db)
+        export_overlay(db_url, out_file, "GPKG", dissolved=dissolve)
+        LOG.info(f"Overlay results written to {out_file}")
+
+        # dump source designations table to geopackage - as layer designations whatever the
+        # table is named, as release() reads it
+        subprocess.run(
+            [
+                "ogr2ogr",
+                "-f",
+                "GPKG",
+                "-nln",
+                "designations",
+                sources_file,
+                f"PG:{db_url}",
+                designations_table,
+            ],
+            check=True,
+        )
+        LOG.info(
+            f"{designations_table} written to {sources_file} as layer designations"
+        )
 
-    # summarize results
-    run(f"{psql} -f sql/land_designations.sql --csv > {LAND_DESIGNATIONS}")
-    run(f"{psql} -f sql/harvest_restrictions.sql --csv > {HARVEST_RESTRICTIONS}")
+        # summarize results
+        with db.connect() as conn:
+            land_designations = pandas.read_sql(text(read_sql("sql/summary.sql")), conn)
+        land_designations, harvest_restrictions = summarize_overlay(land_designations)
+        land_designations.to_csv(LAND_DESIGNATIONS, index=False)
+        harvest_restrictions.to_csv(HARVEST_RESTRICTIONS, index=False)
 
     # compare current summaries to the most recently released version
     log(bucket)
@@ -923,18 +2785,20 @@ def overlay(db_url, out_file, designations_table, bucket, verbose, quiet):
     # not published, since land_designations_summary.csv/harvest_restrictions_summary.csv already
     # carry the same current-run totals (in their "current" column) plus the diff against the
     # previous release
-    for local_file, key in [
-        (out_zip, draft_key(os.path.basename(out_zip))),
-        (sources_zip, draft_key(os.path.basename(sources_zip))),
-        (LAND_DESIGNATIONS_SUMMARY, draft_key(LAND_DESIGNATIONS_SUMMARY)),
-        (HARVEST_RESTRICTIONS_SUMMARY, draft_key(HARVEST_RESTRICTIONS_SUMMARY)),
-        (SOURCES_CSV, draft_key(SOURCES_CSV)),
-    ]:
-        s3_upload_and_tag(bucket, local_file, key, {"commit": commit, "run_id": run_id})
-        LOG.info(
-            f"{local_file} published to s3://{bucket}/{s3_key(key)}, "
-            f"tagged commit={commit}, run_id={run_id}"
-        )
+    s3_publish(
+        bucket,
+        {"commit": commit, "run_id": run_id},
+        [
+            (out_zip, draft_key(os.path.basename(out_zip))),
+            (sources_zip, draft_key(os.path.basename(sources_zip))),
+            (LAND_DESIGNATIONS_SUMMARY, draft_key(LAND_DESIGNATIONS_SUMMARY)),
+            (HARVEST_RESTRICTIONS_SUMMARY, draft_key(HARVEST_RESTRICTIONS_SUMMARY)),
+            (SOURCES_CSV, draft_key(SOURCES_CSV)),
+        ],
+        part_size=part_size,
+        concurrency=upload_concurrency,
+    )
+    LOG.info(f"Outputs tagged commit={commit}, run_id={run_id}")
     LOG.info(f"run_id={run_id} - pass --run_id to release to pin this exact run")
 
 
@@ -956,9 +2820,11 @@ def overlay(db_url, out_file, designations_table, bucket, verbose, quiet):
     is_flag=True,
     help="Delete overlay()'s draft/-prefixed objects for this run after a successful release",
 )
+@part_size_opt
+@upload_concurrency_opt
 @verbose_opt
 @quiet_opt
-def release(run_id, bucket, clean_draft, verbose, quiet):
+def release(run_id, bucket, clean_draft, part_size, upload_concurrency, verbose, quiet):
     """Publish a dated release from the current commit's already-published, already-reviewed overlay output
 
     Publishes a single geopackage under releases/, release-tag-stamped and never overwritten, so
@@ -984,7 +2850,8 @@ def release(run_id, bucket, clean_draft, verbose, quiet):
     separately under the draft/ prefix (see draft_key()), so the two naming schemes never
     collide and this pointer always reflects only the last confirmed release. All five are
     fully redundant with the releases/ geopackage, so it's fine to prune their version history
-    under any lifecycle policy.
+    under any lifecycle policy. The geopackages are overlay()'s draft geopackages, just
+    unzipped, and the csvs are server side copies of the draft objects - none are rebuilt.
 
     Also appends this release's totals to the durable change log. Does not require a database
     connection, so it can run standalone (e.g. in a workflow triggered by a tag push, with no
@@ -1042,13 +2909,20 @@ def release(run_id, bucket, clean_draft, verbose, quiet):
 
     tags = {"commit": commit, "run_id": run_id, "release": release_tag}
 
-    # build the single dated release geopackage, one table at a time - add_gpkg_layer creates it
-    # fresh on the first call and appends on every call after. Each spatial layer is also built
-    # as its own standalone geopackage, for the fixed-name "latest" pointers at the root - for
-    # scripts/mapping applications that want the current release without tracking release tags.
-    # These are plain names at the root - it's overlay()'s draft-tier keys that live under the
-    # separate draft/ prefix, so the two naming schemes never collide
+    # build the single dated release geopackage, in one pass. The spatial layers are also
+    # published as their own standalone geopackages, for the fixed-name "latest" pointers at the
+    # root - for scripts/mapping applications that want the current release without tracking
+    # release tags. These are plain names at the root - it's overlay()'s draft-tier keys that
+    # live under the separate draft/ prefix, so the two naming schemes never collide
     gpkg_file = f"harvest_restrictions_{release_tag}.gpkg"
+    # (layer name, source datasource, source layer) of the release geopackage
+    layers = []
+    # (local file, key) of everything to publish, uploaded together once all are built,
+    # (draft key, version id, key) of draft objects to publish as is, and of draft zips to
+    # publish unzipped
+    uploads = []
+    copies = []
+    unzips = []
 
     for draft_gpkg_zip, layer_name, latest_file in [
         (
@@ -1062,14 +2936,15 @@ def release(run_id, bucket, clean_draft, verbose, quiet):
             "harvest_restrictions_sources.gpkg",
         ),
     ]:
-        local_zip = s3_download_tagged(bucket, draft_key(draft_gpkg_zip), tag_filter)
-        source = vsizip_path(local_zip)
-        add_gpkg_layer(gpkg_file, source, layer_name)
-        LOG.info(f"{layer_name} layer added to {gpkg_file}, from {draft_gpkg_zip}")
-
-        add_gpkg_layer(latest_file, source, layer_name)
-        s3_upload_and_tag(bucket, latest_file, latest_file, tags)
-        LOG.info(f"{latest_file} published to s3://{bucket}/{s3_key(latest_file)}")
+        # the draft zips are read in place (seeking within the sozip archive), never
+        # downloaded. The latest pointer is the draft geopackage itself, as overlay() wrote it
+        # (with the one layer, layer_name) - unzipped from object to object, not rewritten
+        version_id = s3_tagged_version(bucket, draft_key(draft_gpkg_zip), tag_filter)
+        url = s3_presigned_url(bucket, draft_key(draft_gpkg_zip), version_id)
+        layers.append(
+            (layer_name, vsizip_path(f"/vsicurl/{url}", latest_file), layer_name)
+        )
+        unzips.append((draft_key(draft_gpkg_zip), version_id, latest_file))
 
     # the summary csvs and sources listing are added to the release geopackage as non-spatial
     # tables, and published separately as their own fixed-name "latest" pointers, at the same
@@ -1081,19 +2956,18 @@ def release(run_id, bucket, clean_draft, verbose, quiet):
         (HARVEST_RESTRICTIONS_SUMMARY, "harvest_restrictions_summary"),
         (SOURCES_CSV, "sources"),
     ]:
-        s3_download_tagged(bucket, draft_key(key), tag_filter, local_file=key)
-        add_gpkg_layer(gpkg_file, key, table_name, spatial=False)
-        LOG.info(f"{table_name} table added to {gpkg_file}, from {key}")
+        version_id = s3_tagged_version(bucket, draft_key(key), tag_filter)
+        s3_download_version(bucket, draft_key(key), version_id, key)
+        layers.append((table_name, key, None))
+        # the latest pointer is identical to the draft, copy it server side
+        copies.append((draft_key(key), version_id, key))
 
-        s3_upload_and_tag(bucket, key, key, tags)
-        LOG.info(f"{key} published to s3://{bucket}/{s3_key(key)}")
+    write_release_gpkg(gpkg_file, layers)
+    LOG.info(f"{gpkg_file} written, with {', '.join(name for name, _, _ in layers)}")
 
-    # publish the dated geopackage under releases/ - never overwritten, so past releases stay
+    # the dated geopackage goes under releases/ - never overwritten, so past releases stay
     # retrievable regardless of any noncurrent-version lifecycle policy
-    s3_upload_and_tag(bucket, gpkg_file, f"releases/{gpkg_file}", tags)
-    LOG.info(
-        f"{gpkg_file} published to s3://{bucket}/{s3_key(f'releases/{gpkg_file}')}"
-    )
+    uploads.append((gpkg_file, f"releases/{gpkg_file}"))
 
     # append this release's totals to the durable change log - release is the only writer of
     # these two files, so the current version is always the complete up-to-date history. Sourced
@@ -1131,8 +3005,21 @@ def release(run_id, bucket, clean_draft, verbose, quiet):
 
     d_history.to_csv(LAND_DESIGNATIONS_LOG, index=False)
     h_history.to_csv(HARVEST_RESTRICTIONS_LOG, index=False)
-    s3_upload_and_tag(bucket, LAND_DESIGNATIONS_LOG, LAND_DESIGNATIONS_LOG, tags)
-    s3_upload_and_tag(bucket, HARVEST_RESTRICTIONS_LOG, HARVEST_RESTRICTIONS_LOG, tags)
+
+    # publish everything at once (uploads, copies and unzips alike), taking about as long as
+    # the largest file. Then, only once all of the release is published, the change logs -
+    # so a failed release is never logged, and a retry does not log it twice
+    s3_publish(bucket, tags, uploads, copies, unzips, part_size, upload_concurrency)
+    s3_publish(
+        bucket,
+        tags,
+        [
+            (LAND_DESIGNATIONS_LOG, LAND_DESIGNATIONS_LOG),
+            (HARVEST_RESTRICTIONS_LOG, HARVEST_RESTRICTIONS_LOG),
+        ],
+        part_size=part_size,
+        concurrency=upload_concurrency,
+    )
     LOG.info(
         f"Appended release {release_tag} to {LAND_DESIGNATIONS_LOG} and {HARVEST_RESTRICTIONS_LOG}"
     )
@@ -0,0 +1,215 @@
+"""Time the overlay engines on a synthetic 250k tile
+
+The tile is land (harvest restriction 6) but for a corner of sea, subdivided into a grid
+of touching pieces as sql/prepare.sql does, with designations scattered over it - some
+overlapping, most separate. With --db_url, each engine's sql (OVERLAY_ENGINES) is run on
+the tile in a transaction that is rolled back:
+
+    python -m scripts.benchmark_overlay_engines --db_url $DATABASE_URL
+
+Without a database, the geometry work of each engine (noding and polygonizing the rings,
+and for the clustered engine, the clustering and the overlay with the land layer) is
+timed with shapely, over the same GEOS operations the sql calls:
+
+    python -m scripts.benchmark_overlay_engines --designations 2000
+"""
+
+import time
+
+import click
+import numpy
+import shapely
+from sqlalchemy import create_engine
+
+import harvest_restrictions
+
+TILE_SIZE = 100000
+GRID_SIZE = 0.1
+
+FIXTURE_SQL = """
+CREATE SCHEMA IF NOT EXISTS whse_basemapping;
+CREATE TABLE IF NOT EXISTS whse_basemapping.nts_50k_grid (map_tile text, geom geometry);
+CREATE TEMPORARY TABLE harvest_restriction_class_rank_name_xref AS
+SELECT harvest_restriction_class_rank, 'class ' || harvest_restriction_class_rank
+  AS harvest_restriction_class_name
+FROM generate_series(1, 6) AS harvest_restriction_class_rank;
+CREATE TEMPORARY TABLE harvest_restrictions
+(LIKE public.harvest_restrictions INCLUDING DEFAULTS INCLUDING GENERATED);
+CREATE TEMPORARY TABLE designations_tiled (
+  map_tile text,
+  index integer,
+  alias text,
+  description text,
+  primary_key text,
+  name text,
+  harvest_restriction integer,
+  geom geometry(POLYGON, 3005)
+);
+"""
+
+
+def synthetic_tile(designations, land_cells, seed):
+    """(index, primary_key, harvest_restriction, polygon) of the designations of a
+    synthetic tile, and of its land - a single land feature with a curved coastline (the
+    tile less a circle of sea at one corner), subdivided into a grid of pieces"""
+    rng = numpy.random.default_rng(seed)
+    step = TILE_SIZE / land_cells
+    x, y = numpy.meshgrid(
+        numpy.arange(land_cells) * step, numpy.arange(land_cells) * step
+    )
+    grid = shapely.box(x.ravel(), y.ravel(), x.ravel() + step, y.ravel() + step)
+    sea = shapely.Point(TILE_SIZE, TILE_SIZE).buffer(0.4 * TILE_SIZE, quad_segs=1024)
+    land = shapely.segmentize(shapely.box(0, 0, TILE_SIZE, TILE_SIZE) - sea, 200)
+    land = shapely.get_parts(shapely.intersection(grid, land, grid_size=GRID_SIZE))
+    land = land[shapely.get_type_id(land) == 3]
+    centres = shapely.points(rng.uniform(0, TILE_SIZE, (designations, 2)))
+    radii = rng.lognormal(mean=5, sigma=1, size=designations).clip(20, 5000)
+    polygons = shapely.buffer(centres, radii, quad_segs=16)
+    rows = [
+        (int(rng.integers(1, 46)), str(i), int(rng.integers(1, 6)), polygon)
+        for i, polygon in enumerate(polygons)
+    ]
+    rows += [(47, "land", 6, polygon) for polygon in land]
+    return rows
+
+
+def polygonize(polygons):
+    """node the rings of polygons, polygonize, and keep the faces within any polygon"""
+    noded = shapely.union_all(shapely.get_rings(polygons), grid_size=GRID_SIZE)
+    faces = shapely.get_parts(shapely.polygonize(shapely.get_parts(noded)))
+    tree = shapely.STRtree(polygons)
+    face_index, _ = tree.query(shapely.point_on_surface(faces), predicate="within")
+    return faces[numpy.unique(face_index)]
+
+
+def polygonal(geoms):
+    """the polygons of each of geoms, as ST_CollectionExtract(geom, 3)"""
+    parts, index = shapely.get_parts(geoms, return_index=True)
+    parts, parts_index = shapely.get_parts(parts, return_index=True)
+    index = index[parts_index]
+    keep = shapely.get_type_id(parts) == 3
+    out = numpy.full(len(geoms), shapely.MultiPolygon(), dtype=object)
+    return shapely.multipolygons(parts[keep], indices=index[keep], out=out)
+
+
+def geos_polygonize(rows):
+    """as sql/overlay.sql - all rings of the tile at once"""
+    return polygonize(numpy.array([r[3] for r in rows]))
+
+
+def geos_clustered(rows):
+    """as sql/overlay_clustered.sql - rings per cluster of designations (less the land),
+    then the pieces overlaid with the (single) land feature"""
+    designated = numpy.array([r[3] for r in rows if r[2] != 6])
+    land = numpy.array([r[3] for r in rows if r[2] == 6])
+    shells = shapely.polygons(shapely.get_exterior_ring(designated))
+    a, b = shapely.STRtree(shells).query(
+        shells, predicate="dwithin", distance=GRID_SIZE
+    )
+    clusters = harvest_restrictions.connected_components(
+        zip(a.tolist(), b.tolist(), strict=True)
+    )
+    members = {}
+    for i, cluster in clusters.items():
+        members.setdefault(cluster, []).append(i)
+    pieces = numpy.concatenate([polygonize(designated[m]) for m in members.values()])
+
+    # pieces within the land kept as is, those crossing the coast split
+    land_dissolved = shapely.union_all(land, grid_size=GRID_SIZE)
+    shapely.prepare(land_dissolved)
+    covered = shapely.covered_by(pieces, land_dissolved)
+    crossing = pieces[~covered]
+    on_land = polygonal(
+        shapely.intersection(crossing, land_dissolved, grid_size=GRID_SIZE)
+    )
+    off_land = shapely.difference(crossing, on_land, grid_size=GRID_SIZE)
+
+    # land less the pieces over it
+    land_index, piece_index = shapely.STRtree(pieces).query(
+        land, predicate="intersects"
+    )
+    land_only = [
+        shapely.difference(
+            land[i],
+            shapely.coverage_union_all(pieces[piece_index[land_index == i]]),
+            grid_size=GRID_SIZE,
+        )
+        for i in numpy.unique(land_index)
+    ]
+    return numpy.concatenate([pieces[covered], on_land, off_land, land_only])
+
+
+def time_geos(rows, repeat):
+    """fastest of repeat runs of each engine's geometry work, in seconds"""
+    timings = {}
+    for engine, func in [
+        ("polygonize", geos_polygonize),
+        ("clustered", geos_clustered),
+    ]:
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func(rows)
+            times.append(time.perf_counter() - start)
+        timings[engine] = min(times)
+    return timings
+
+
+def time_db(db_url, rows, repeat):
+    """fastest of repeat runs of each engine's sql on the tile, in seconds"""
+    conn = create_engine(db_url).raw_connection()
+    timings = {}
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(FIXTURE_SQL)
+            cursor.executemany(
+                "INSERT INTO designations_tiled VALUES "
+                "('092B', %s, 'alias' || %s, 'alias' || %s, %s, %s, %s, "
+                "ST_GeomFromText(%s, 3005))",
+                [
+                    (index, index, index, pk, pk, restriction, polygon.wkt)
+                    for index, pk, restriction, polygon in rows
+                ],
+            )
+            cursor.execute("CREATE INDEX ON designations_tiled USING gist (geom)")
+            for engine, sql_file in harvest_restrictions.OVERLAY_ENGINES.items():
+                sql = harvest_restrictions.read_sql(sql_file)
+                times = []
+                for _ in range(repeat):
+                    cursor.execute("SAVEPOINT engine")
+                    start = time.perf_counter()
+                    cursor.execute(sql, {"tile": "092B", "cell": None})
+                    times.append(time.perf_counter() - start)
+                    cursor.execute("ROLLBACK TO SAVEPOINT engine")
+                timings[engine] = min(times)
+    finally:
+        conn.rollback()
+        conn.close()
+    return timings
+
+
+@click.command()
+@click.option("--db_url", default=None, help="Time the engines' sql on this database")
+@click.option("--designations", type=click.IntRange(min=1), default=2000)
+@click.option(
+    "--land_cells",
+    type=click.IntRange(min=1),
+    default=16,
+    help="Land layer pieces per side of the tile",
+)
+@click.option("--repeat", type=click.IntRange(min=1), default=3)
+@click.option("--seed", type=int, default=1)
+def benchmark(db_url, designations, land_cells, repeat, seed):
+    """Time the overlay engines on a synthetic 250k tile"""
+    rows = synthetic_tile(designations, land_cells, seed)
+    timings = time_db(db_url, rows, repeat) if db_url else time_geos(rows, repeat)
+    for engine, seconds in timings.items():
+        click.echo(
+            f"{engine}: {seconds:.2f}s ({designations} designations, "
+            f"{land_cells * land_cells} land pieces, {'sql' if db_url else 'geos'}, "
+            f"best of {repeat})"
+        )
+
+
+if __name__ == "__main__":
+    benchmark()
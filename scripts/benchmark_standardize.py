@@ -0,0 +1,69 @@
+"""Time to_multipart and standardize_source on a synthetic frame
+
+The frame is 80% Polygon and 20% MultiPolygon, with one primary key column, one name
+column and one constant. Compare commits by running the script at each:
+
+    python -m scripts.benchmark_standardize --features 500000
+"""
+
+import time
+
+import click
+import geopandas
+import numpy
+import shapely
+
+from harvest_restrictions import standardize_source, to_multipart
+
+
+def synthetic_frame(features):
+    x = numpy.arange(features, dtype=float) * 10
+    polygons = shapely.box(x, 0, x + 5, 5)
+    multi = numpy.arange(features) % 5 == 0
+    polygons[multi] = shapely.multipolygons(polygons[multi].reshape(-1, 1))
+    return geopandas.GeoDataFrame(
+        {
+            "pk": numpy.arange(features),
+            "name": [f"feature {i}" for i in range(features)],
+        },
+        geometry=geopandas.GeoSeries(polygons, crs="EPSG:3005"),
+    )
+
+
+def best_of(repeat, func, df):
+    """fastest of repeat runs of func on a fresh copy of df, in seconds"""
+    times = []
+    for _ in range(repeat):
+        data = df.copy()
+        start = time.perf_counter()
+        func(data)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+@click.command()
+@click.option("--features", type=click.IntRange(min=1), default=500000)
+@click.option("--repeat", type=click.IntRange(min=1), default=3)
+def benchmark(features, repeat):
+    """Time to_multipart and standardize_source on a synthetic frame"""
+    source = {
+        "alias": "benchmark",
+        "source_type": "FILE",
+        "description": "Benchmark",
+        "index": 1,
+        "primary_key": "pk",
+        "field_mapper": {"name": "name"},
+        "data": {"harvest_restriction": 1},
+    }
+    df = synthetic_frame(features)
+    df_geom = df.rename_geometry("geom")
+    click.echo(
+        f"to_multipart: {best_of(repeat, to_multipart, df_geom):.2f}s, "
+        f"full standardization: "
+        f"{best_of(repeat, lambda d: standardize_source(source, d), df):.2f}s "
+        f"({features} features, best of {repeat})"
+    )
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,62 @@
+-- ------------------
+-- ## dissolve the overlay output of a tile that was split into 50k cells, merging
+-- polygons with the same designations across cell seams
+-- ------------------
+with split as (
+  delete from harvest_restrictions
+  where map_tile_250k = :'tile'
+  returning *
+)
+
+INSERT INTO harvest_restrictions (
+    land_designation_name,
+    land_designation_type_rank,
+    land_designation_type_code,
+    land_designation_type_name,
+    land_designation_primary_key,
+    harvest_restriction_class_rank,
+    harvest_restriction_class_name,
+    all_land_desig_names,
+    all_land_desig_type_ranks,
+    all_land_desig_type_codes,
+    all_land_desig_type_names,
+    all_land_desig_primary_keys,
+    all_harv_restrict_class_ranks,
+    all_harv_restrict_class_names,
+    map_tile_250k,
+    geom
+)
+SELECT
+  land_designation_name,
+  land_designation_type_rank,
+  land_designation_type_code,
+  land_designation_type_name,
+  land_designation_primary_key,
+  harvest_restriction_class_rank,
+  harvest_restriction_class_name,
+  all_land_desig_names,
+  all_land_desig_type_ranks,
+  all_land_desig_type_codes,
+  all_land_desig_type_names,
+  all_land_desig_primary_keys,
+  all_harv_restrict_class_ranks,
+  all_harv_restrict_class_names,
+  map_tile_250k,
+  st_union(geom, .1) as geom
+from split
+group by
+  land_designation_name,
+  land_designation_type_rank,
+  land_designation_type_code,
+  land_designation_type_name,
+  land_designation_primary_key,
+  harvest_restriction_class_rank,
+  harvest_restriction_class_name,
+  all_land_desig_names,
+  all_land_desig_type_ranks,
+  all_land_desig_type_codes,
+  all_land_desig_type_names,
+  all_land_desig_primary_keys,
+  all_harv_restrict_class_ranks,
+  all_harv_restrict_class_names,
+  map_tile_250k;
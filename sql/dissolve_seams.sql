@@ -0,0 +1,85 @@
+-- ------------------
+-- ## dissolve overlay output across 250k tile seams, for export
+-- rows of adjacent tiles with identical designations are grouped into components
+-- (temp table seam_components, built by the caller), and each component is unioned -
+-- all other rows are copied as is. Only rows exported (see DUMP_SQL) are included
+-- ------------------
+CREATE TABLE IF NOT EXISTS harvest_restrictions_dissolved (LIKE harvest_restrictions);
+
+TRUNCATE harvest_restrictions_dissolved;
+
+-- rows not on a seam (or with no matching neighbour)
+INSERT INTO harvest_restrictions_dissolved
+SELECT h.*
+FROM harvest_restrictions h
+LEFT OUTER JOIN seam_components c
+ON h.harvest_restrictions_id = c.harvest_restrictions_id
+WHERE c.harvest_restrictions_id IS NULL
+AND h.designated_land;
+
+-- rows merged across seams, listing all of their tiles in map_tile_250k
+INSERT INTO harvest_restrictions_dissolved (
+    harvest_restrictions_id,
+    land_designation_name,
+    land_designation_type_rank,
+    land_designation_type_code,
+    land_designation_type_name,
+    land_designation_primary_key,
+    harvest_restriction_class_rank,
+    harvest_restriction_class_name,
+    all_land_desig_names,
+    all_land_desig_type_ranks,
+    all_land_desig_type_codes,
+    all_land_desig_type_names,
+    all_land_desig_primary_keys,
+    all_harv_restrict_class_ranks,
+    all_harv_restrict_class_names,
+    map_tile_250k,
+    area_ha,
+    designated_land,
+    geom
+)
+SELECT
+  min(h.harvest_restrictions_id) as harvest_restrictions_id,
+  h.land_designation_name,
+  h.land_designation_type_rank,
+  h.land_designation_type_code,
+  h.land_designation_type_name,
+  h.land_designation_primary_key,
+  h.harvest_restriction_class_rank,
+  h.harvest_restriction_class_name,
+  h.all_land_desig_names,
+  h.all_land_desig_type_ranks,
+  h.all_land_desig_type_codes,
+  h.all_land_desig_type_names,
+  h.all_land_desig_primary_keys,
+  h.all_harv_restrict_class_ranks,
+  h.all_harv_restrict_class_names,
+  string_agg(h.map_tile_250k, ';' ORDER BY h.map_tile_250k) as map_tile_250k,
+  sum(h.area_ha) as area_ha,
+  true as designated_land,
+  st_multi(st_union(h.geom, .1)) as geom
+FROM harvest_restrictions h
+INNER JOIN seam_components c
+ON h.harvest_restrictions_id = c.harvest_restrictions_id
+GROUP BY
+  c.component_id,
+  h.land_designation_name,
+  h.land_designation_type_rank,
+  h.land_designation_type_code,
+  h.land_designation_type_name,
+  h.land_designation_primary_key,
+  h.harvest_restriction_class_rank,
+  h.harvest_restriction_class_name,
+  h.all_land_desig_names,
+  h.all_land_desig_type_ranks,
+  h.all_land_desig_type_codes,
+  h.all_land_desig_type_names,
+  h.all_land_desig_primary_keys,
+  h.all_harv_restrict_class_ranks,
+  h.all_harv_restrict_class_names;
+
+CREATE INDEX IF NOT EXISTS harvest_restrictions_dissolved_geom_idx
+ON harvest_restrictions_dissolved USING gist (geom);
+
+ANALYZE harvest_restrictions_dissolved;
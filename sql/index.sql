@@ -0,0 +1,13 @@
+-- ------------------
+-- ## index the overlay output for export and summary, and update its statistics
+-- (built after the overlay, rather than maintained through the per-tile writes)
+-- ------------------
+CREATE INDEX IF NOT EXISTS harvest_restrictions_geom_idx
+ON harvest_restrictions USING gist (geom);
+
+-- exported/summarized rows
+CREATE INDEX IF NOT EXISTS harvest_restrictions_designated_land_idx
+ON harvest_restrictions (harvest_restriction_class_rank, land_designation_type_rank)
+WHERE designated_land;
+
+ANALYZE harvest_restrictions;
@@ -0,0 +1,31 @@
+-- ------------------
+-- ## bring a database created from an earlier sql/setup.sql up to date
+-- setup.sql only runs when the database volume is first created - run before every
+-- overlay, so everything here must be idempotent
+-- ------------------
+
+-- overlay progress (see sql/setup.sql)
+CREATE TABLE IF NOT EXISTS harvest_restrictions_progress (
+  map_tile text primary key,
+  completed_at timestamp with time zone,
+  digest text
+);
+
+-- area and designated land flag of each output row, computed on insert (see sql/setup.sql).
+-- Adding a stored generated column computes it for any existing rows
+ALTER TABLE harvest_restrictions
+ADD COLUMN IF NOT EXISTS area_ha double precision
+GENERATED ALWAYS AS (st_area(geom) / 10000) STORED;
+
+ALTER TABLE harvest_restrictions
+ADD COLUMN IF NOT EXISTS designated_land boolean GENERATED ALWAYS AS (
+  all_harv_restrict_class_ranks @> ARRAY[6] and
+  all_harv_restrict_class_ranks != ARRAY[6]
+) STORED;
+
+-- for clearing/dissolving output per tile
+CREATE INDEX IF NOT EXISTS harvest_restrictions_map_tile_250k_idx
+ON harvest_restrictions (map_tile_250k);
+
+-- no longer built by sql/index.sql, nothing queries the class ranks array by containment
+DROP INDEX IF EXISTS harvest_restrictions_class_ranks_idx;
@@ -1,28 +1,34 @@
 -- ------------------
--- ## clean/subdivide geoms
+-- ## select this tile's slice of the cleaned/subdivided designations (see prepare.sql)
+-- if a 50k cell is provided (splitting a heavy tile), select just that part of the tile
 -- ------------------
-create temporary table cleaned as
+create temporary table cleaned on commit drop as
 
-with tile as (
+with cell as (
+  select st_reduceprecision(geom, .1) as geom
+  from whse_basemapping.nts_50k_grid
+  where map_tile = :'cell'
+),
+
+tile as (
   select
-    t.map_tile,
-    s.index,
-    s.alias,
-    s.description,
-    s.primary_key,
-    s.name,
-    s.harvest_restriction,
+    d.map_tile,
+    d.index,
+    d.alias,
+    d.description,
+    d.primary_key,
+    d.name,
+    d.harvest_restriction,
     CASE
-      WHEN ST_CoveredBy(ST_ReducePrecision(s.geom, .1), ST_ReducePrecision(t.geom, .1)) THEN ST_MakeValid(ST_ReducePrecision(s.geom, .1))
-      ELSE ST_MakeValid((ST_Intersection(ST_ReducePrecision(s.geom, .1), ST_ReducePrecision(t.geom, .1), .1)))
+      WHEN c.geom is null OR ST_CoveredBy(d.geom, c.geom) THEN d.geom
+      ELSE ST_MakeValid(ST_Intersection(d.geom, c.geom, .1))
     END as geom
-  from designations s
-  inner join whse_basemapping.nts_250k_grid t
-  on st_intersects(s.geom, t.geom)
-  where map_tile = :'tile'
+  from designations_tiled d
+  left outer join cell c on true
+  where d.map_tile = :'tile'
+  and (c.geom is null or st_intersects(d.geom, c.geom))
 )
 
--- dump and subdivide
 select * from (
 select
   map_tile,
@@ -32,7 +38,7 @@ select
   primary_key,
   name,
   harvest_restriction,
-  st_makevalid(st_subdivide((st_dump(geom)).geom)) as geom
+  (st_dump(geom)).geom as geom
 from tile
 ) as a where st_dimension(geom) = 2 ;  -- do not include any line/point artifacts created by intersect
 
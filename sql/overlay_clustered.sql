@@ -0,0 +1,372 @@
+-- overlay engine "clustered" - as overlay.sql, but noding and polygonizing each cluster of
+-- interacting designations separately, rather than all designations in the tile at once.
+-- The land layer (harvest restriction 6, no special restriction) covers the whole tile, so
+-- it would join every designation into one cluster - it is left out of the clustering, and
+-- overlaid with the clustered output at the end instead (land features do not overlap
+-- each other)
+
+-- ------------------
+-- ## select this tile's slice of the cleaned/subdivided designations (see prepare.sql)
+-- if a 50k cell is provided (splitting a heavy tile), select just that part of the tile
+-- ------------------
+create temporary table cleaned on commit drop as
+
+with cell as (
+  select st_reduceprecision(geom, .1) as geom
+  from whse_basemapping.nts_50k_grid
+  where map_tile = :'cell'
+),
+
+tile as (
+  select
+    d.map_tile,
+    d.index,
+    d.alias,
+    d.description,
+    d.primary_key,
+    d.name,
+    d.harvest_restriction,
+    CASE
+      WHEN c.geom is null OR ST_CoveredBy(d.geom, c.geom) THEN d.geom
+      ELSE ST_MakeValid(ST_Intersection(d.geom, c.geom, .1))
+    END as geom
+  from designations_tiled d
+  left outer join cell c on true
+  where d.map_tile = :'tile'
+  and (c.geom is null or st_intersects(d.geom, c.geom))
+)
+
+select * from (
+select
+  map_tile,
+  index,
+  alias,
+  description,
+  primary_key,
+  name,
+  harvest_restriction,
+  (st_dump(geom)).geom as geom
+from tile
+) as a where st_dimension(geom) = 2 ;  -- do not include any line/point artifacts created by intersect
+
+create index on cleaned using gist (geom);
+
+-- ------------------
+-- ## cluster the designations (less the land layer)
+-- designations within .1m of each other (the noding precision), or nested in each other's
+-- holes, are in the same cluster - rings of different clusters can not interact, so each
+-- cluster can be noded and polygonized separately
+-- ------------------
+create temporary table clustered on commit drop as
+select
+  *,
+  ST_ClusterDBSCAN(ST_MakePolygon(ST_ExteriorRing(geom)), .1, 1) over () as cluster_id
+from cleaned
+where harvest_restriction is distinct from 6;
+
+create index on clustered using gist (geom);
+create index on clustered (cluster_id);
+
+-- the land layer (as subdivided by prepare.sql), with an id per land feature
+create temporary table land on commit drop as
+select
+  dense_rank() over (order by index, alias, description, primary_key, name) as land_id,
+  *
+from cleaned
+where harvest_restriction = 6;
+
+create index on land using gist (geom);
+
+-- and each land feature whole, for splitting the designations crossing its boundary
+create temporary table land_dissolved on commit drop as
+select
+  land_id,
+  st_union(geom, .1) as geom
+from land
+group by land_id;
+
+create index on land_dissolved using gist (geom);
+
+
+-- ------------------
+-- ## run the overlay, per cluster
+-- ------------------
+
+-- dump poly rings and convert to lines
+create temporary table pieces on commit drop as
+with rings as
+(
+  SELECT
+    map_tile,
+    cluster_id,
+    ST_Exteriorring((ST_DumpRings(geom)).geom) AS geom
+  FROM clustered
+),
+
+-- node the lines with st_union and dump to singlepart lines
+lines as
+(
+  SELECT
+    map_tile,
+    cluster_id,
+    (st_dump(st_union(geom, .1))).geom as geom
+  FROM rings
+  GROUP BY map_tile, cluster_id
+),
+
+-- polygonize the resulting noded lines
+flattened AS
+(
+  SELECT
+    map_tile,
+    cluster_id,
+    (ST_Dump(ST_Polygonize(geom))).geom AS geom
+  FROM lines
+  GROUP BY map_tile, cluster_id
+)
+
+SELECT
+  row_number() over () as piece_id,
+  map_tile,
+  cluster_id,
+  geom
+FROM flattened;
+
+create index on pieces using gist (geom);
+
+-- the designations each piece is within (pieces within none, holes, are dropped)
+create temporary table piece_designations on commit drop as
+SELECT
+  f.piece_id,
+  p.index,
+  p.alias,
+  p.description,
+  p.primary_key,
+  p.name,
+  p.harvest_restriction
+FROM pieces f
+INNER JOIN clustered p
+ON p.cluster_id = f.cluster_id
+AND ST_Contains(p.geom, ST_PointOnSurface(f.geom));
+
+delete from pieces
+where piece_id not in (select piece_id from piece_designations);
+
+
+-- ------------------
+-- ## overlay the designated pieces with the land layer
+-- pieces within a land feature (most) are kept as is, pieces crossing the boundary of a
+-- land feature are split into their parts on and off land, and the land not covered by
+-- any piece is added as is
+-- ------------------
+create temporary table piece_land on commit drop as
+SELECT
+  f.piece_id,
+  l.land_id,
+  ST_CoveredBy(f.geom, l.geom) as covered
+FROM land_dissolved l
+INNER JOIN pieces f
+ON ST_Intersects(f.geom, l.geom);
+
+create index on piece_land (piece_id);
+
+with crossing as
+(
+  SELECT *
+  FROM pieces
+  WHERE piece_id NOT IN (SELECT piece_id FROM piece_land WHERE covered)
+),
+
+-- designated, crossing land boundaries - the part on each land feature
+on_land as
+(
+  SELECT
+    f.map_tile,
+    f.piece_id,
+    pl.land_id,
+    ST_CollectionExtract(ST_Intersection(f.geom, l.geom, .1), 3) as geom
+  FROM crossing f
+  INNER JOIN piece_land pl
+  ON f.piece_id = pl.piece_id
+  INNER JOIN land_dissolved l
+  ON pl.land_id = l.land_id
+),
+
+parts as
+(
+  -- designated, within a land feature
+  SELECT
+    f.map_tile,
+    f.piece_id,
+    pl.land_id,
+    f.geom
+  FROM pieces f
+  INNER JOIN piece_land pl
+  ON f.piece_id = pl.piece_id
+  WHERE pl.covered
+
+  UNION ALL
+
+  SELECT * FROM on_land
+
+  UNION ALL
+
+  -- designated, crossing land boundaries (or off land entirely) - the rest of the piece
+  SELECT
+    f.map_tile,
+    f.piece_id,
+    null as land_id,
+    CASE
+      WHEN o.geom is null THEN f.geom
+      ELSE ST_CollectionExtract(ST_Difference(f.geom, o.geom, .1), 3)
+    END as geom
+  FROM crossing f
+  LEFT JOIN (
+    SELECT piece_id, st_union(geom, .1) as geom
+    FROM on_land
+    GROUP BY piece_id
+  ) o
+  ON f.piece_id = o.piece_id
+
+  UNION ALL
+
+  -- land, not designated (pieces of a polygonized cluster form a coverage, and clusters
+  -- are disjoint, so the pieces over each land piece can be merged as a coverage)
+  SELECT
+    l.map_tile,
+    null as piece_id,
+    l.land_id,
+    CASE
+      WHEN f.geom is null THEN l.geom
+      ELSE ST_CollectionExtract(ST_Difference(l.geom, f.geom, .1), 3)
+    END as geom
+  FROM land l
+  LEFT JOIN LATERAL (
+    SELECT ST_CoverageUnion(geom) as geom
+    FROM pieces
+    WHERE ST_Intersects(l.geom, pieces.geom)
+  ) f ON true
+),
+
+numbered as
+(
+  SELECT
+    row_number() over () as part_id,
+    *
+  FROM parts
+  WHERE NOT ST_IsEmpty(geom)
+),
+
+-- the designations of each part - those of its piece, plus its land feature
+members as
+(
+  SELECT
+    n.part_id,
+    n.map_tile,
+    n.geom,
+    d.index,
+    d.alias,
+    d.description,
+    d.primary_key,
+    d.name,
+    d.harvest_restriction
+  FROM numbered n
+  INNER JOIN piece_designations d
+  ON d.piece_id = n.piece_id
+
+  UNION ALL
+
+  SELECT
+    n.part_id,
+    n.map_tile,
+    n.geom,
+    l.index,
+    l.alias,
+    l.description,
+    l.primary_key,
+    l.name,
+    l.harvest_restriction
+  FROM numbered n
+  INNER JOIN (SELECT DISTINCT ON (land_id) * FROM land) l
+  ON l.land_id = n.land_id
+),
+
+-- get the attributes and sort by index
+sorted AS
+(
+  SELECT
+    p.index,
+    p.alias,
+    p.description,
+    p.primary_key,
+    p.name,
+    COALESCE(p.harvest_restriction, 0) as harvest_restriction,
+    hrn.harvest_restriction_class_name,
+    p.part_id,
+    p.map_tile,
+    p.geom
+  FROM members p
+  INNER JOIN harvest_restriction_class_rank_name_xref hrn on p.harvest_restriction = hrn.harvest_restriction_class_rank
+  ORDER BY p.index, p.primary_key
+),
+
+aggregated as (
+  SELECT
+    map_tile,
+    array_agg(index ORDER BY index) as indexes_all,
+    array_agg(alias ORDER BY index) as aliases_all,
+    array_agg(description ORDER BY index) as descriptions_all,
+    array_agg(primary_key ORDER BY index) as primary_keys_all,
+    array_agg(name ORDER BY index) as names_all,
+    array_agg(harvest_restriction ORDER BY index) as harvest_restrictions_all,
+    array_agg(harvest_restriction_class_name ORDER BY index) as harvest_restriction_class_names_all,
+    geom
+  FROM sorted
+  GROUP BY map_tile, part_id, geom
+)
+
+INSERT INTO harvest_restrictions (
+    land_designation_name,
+    land_designation_type_rank,
+    land_designation_type_code,
+    land_designation_type_name,
+    land_designation_primary_key,
+    harvest_restriction_class_rank,
+    harvest_restriction_class_name,
+    all_land_desig_names,
+    all_land_desig_type_ranks,
+    all_land_desig_type_codes,
+    all_land_desig_type_names,
+    all_land_desig_primary_keys,
+    all_harv_restrict_class_ranks,
+    all_harv_restrict_class_names,
+    map_tile_250k,
+    geom
+)
+SELECT
+  names_all[1] as land_designation_name,
+  indexes_all[1] as land_designation_type_rank,
+  aliases_all[1] as land_designation_type_code,
+  descriptions_all[1] as land_designation_type_name,
+  primary_keys_all[1] as land_designation_primary_key,
+  harvest_restrictions_all[1] as harvest_restriction_class_rank,
+  harvest_restriction_class_names_all[1] as harvest_restriction_class_name,
+  names_all as all_land_desig_names,
+  indexes_all as all_land_desig_type_ranks,
+  aliases_all as all_land_desig_type_codes,
+  descriptions_all as all_land_desig_type_names,
+  primary_keys_all as all_land_desig_primary_keys,
+  harvest_restrictions_all as all_harv_restrict_class_ranks,
+  harvest_restriction_class_names_all as all_harv_restrict_class_names,
+  map_tile as map_tile_250k,
+  st_union(geom, .1) as geom
+from aggregated
+group by
+  names_all,
+  indexes_all,
+  aliases_all,
+  descriptions_all,
+  primary_keys_all,
+  harvest_restrictions_all,
+  harvest_restriction_class_names_all,
+  map_tile;
\ No newline at end of file
@@ -0,0 +1,65 @@
+-- ------------------
+-- ## clean and tile designations, once per overlay run
+-- snap to the 0.1m grid, make valid, split by 250k tile and subdivide - so the per-tile
+-- overlay (sql/overlay.sql) only has to select its slice
+-- ------------------
+drop table if exists designations_tiled;
+
+create temporary table reduced as
+select
+  index,
+  alias,
+  description,
+  primary_key,
+  name,
+  harvest_restriction,
+  st_makevalid(st_reduceprecision(geom, .1)) as geom
+from designations;
+
+create index on reduced using gist (geom);
+
+create temporary table tiles as
+select
+  map_tile,
+  st_reduceprecision(geom, .1) as geom
+from whse_basemapping.nts_250k_grid;
+
+create index on tiles using gist (geom);
+
+create table designations_tiled as
+
+with tile as (
+  select
+    t.map_tile,
+    s.index,
+    s.alias,
+    s.description,
+    s.primary_key,
+    s.name,
+    s.harvest_restriction,
+    CASE
+      WHEN ST_CoveredBy(s.geom, t.geom) THEN s.geom
+      ELSE ST_MakeValid(ST_Intersection(s.geom, t.geom, .1))
+    END as geom
+  from reduced s
+  inner join tiles t
+  on st_intersects(s.geom, t.geom)
+)
+
+-- dump and subdivide
+select * from (
+select
+  map_tile,
+  index,
+  alias,
+  description,
+  primary_key,
+  name,
+  harvest_restriction,
+  st_makevalid(st_subdivide((st_dump(geom)).geom)) as geom
+from tile
+) as a where st_dimension(geom) = 2 ;  -- do not include any line/point artifacts created by intersect
+
+create index on designations_tiled (map_tile);
+create index on designations_tiled using gist (geom);
+analyze designations_tiled;
@@ -31,5 +31,25 @@ CREATE TABLE harvest_restrictions (
   all_harv_restrict_class_ranks integer[],
   all_harv_restrict_class_names text[],
   map_tile_250k text,
-  geom geometry(MULTIPOLYGON, 3005)
-);
\ No newline at end of file
+  geom geometry(MULTIPOLYGON, 3005),
+  -- area, and whether the row is land area with a designation (as exported/summarized),
+  -- computed once on insert
+  area_ha double precision GENERATED ALWAYS AS (st_area(geom) / 10000) STORED,
+  designated_land boolean GENERATED ALWAYS AS (
+    all_harv_restrict_class_ranks @> ARRAY[6] and
+    all_harv_restrict_class_ranks != ARRAY[6]
+  ) STORED
+);
+
+-- for clearing/dissolving output per tile (further indexes are built after the overlay,
+-- see sql/index.sql)
+CREATE INDEX harvest_restrictions_map_tile_250k_idx
+ON harvest_restrictions (map_tile_250k);
+
+-- overlay progress, tiles completed in the current run (for overlay --resume) and a digest
+-- of each tile's overlay inputs (for overlay --incremental)
+CREATE TABLE harvest_restrictions_progress (
+  map_tile text primary key,
+  completed_at timestamp with time zone,
+  digest text
+);
@@ -1,6 +1,57 @@
+import json
+import os
+import xml.etree.ElementTree as ET
+import zipfile
+
+import geopandas
+import numpy
+import pandas
+import pyarrow.parquet
 import pytest
+from click.testing import CliRunner
+from moto import mock_aws
+from shapely import wkt
+from shapely.geometry import LineString, MultiPolygon, Point, box
+from sqlalchemy import create_engine
 
-from harvest_restrictions import download_source, validate_sources, parse_sources
+import harvest_restrictions
+from harvest_restrictions import (
+    OVERLAY_ENGINES,
+    cache_group,
+    connected_components,
+    download_group,
+    download_group_chunks,
+    download_source,
+    file_url,
+    filter_query,
+    load_parquet,
+    manifest_key,
+    overlay_tile_python,
+    parse_sources,
+    read_sql,
+    release_vrt,
+    s3_client,
+    s3_copy_version,
+    s3_delete,
+    s3_download_current,
+    s3_download_version,
+    s3_find_version,
+    s3_get_tags,
+    s3_publish,
+    s3_read_manifest,
+    s3_unzip_version,
+    s3_upload_and_tag,
+    s3_write_manifest,
+    sort_spatially,
+    source_groups,
+    source_host,
+    standardize_source,
+    summarize_overlay,
+    to_multipart,
+    union_query,
+    validate_sources,
+    write_parquet,
+)
 
 
 @pytest.fixture
@@ -80,3 +131,640 @@ def test_invalid_file(test_data):
     sources[0]["field_mapper"] = {"name": "INVALID_COLUMN"}
     with pytest.raises(ValueError):
         sources = validate_sources(sources)
+
+
+def test_source_host(test_data):
+    sources = parse_sources(test_data)
+    assert source_host(sources[0]) == "openmaps.gov.bc.ca"
+    assert source_host(sources[1]).startswith("s3://")
+
+
+def test_source_groups(test_data):
+    park_er = dict(
+        test_data[0],
+        alias="park_er",
+        source="WHSE_TANTALIS.TA_PARK_ECORES_PA_SVW",
+        query="PROTECTED_LANDS_DESIGNATION = 'ECOLOGICAL RESERVE'",
+    )
+    park_provincial = dict(
+        park_er,
+        alias="park_provincial",
+        query="PROTECTED_LANDS_DESIGNATION = 'PROVINCIAL PARK'",
+    )
+    sources = parse_sources([test_data[0], park_er, test_data[1], park_provincial])
+    groups = source_groups(sources)
+    assert [[s["alias"] for s in g] for g in groups] == [
+        ["park_national"],
+        ["park_er", "park_provincial"],
+        ["crd_water_supply_area"],
+    ]
+    assert union_query(groups[1]) == (
+        "(PROTECTED_LANDS_DESIGNATION = 'ECOLOGICAL RESERVE') OR "
+        "(PROTECTED_LANDS_DESIGNATION = 'PROVINCIAL PARK')"
+    )
+    assert union_query(groups[0]) is None
+
+
+def test_filter_query():
+    df = geopandas.GeoDataFrame(
+        {
+            "protected_lands_designation": ["ECOLOGICAL RESERVE", "PROVINCIAL PARK"],
+            "feature_notes": [None, "not a legal boundary"],
+        },
+        geometry=[box(0, 0, 1, 1), box(1, 1, 2, 2)],
+        crs="EPSG:3005",
+    )
+    subset = filter_query(df, "PROTECTED_LANDS_DESIGNATION = 'PROVINCIAL PARK'")
+    assert list(subset.index) == [1]
+    subset = filter_query(df, "FEATURE_NOTES IS NULL")
+    assert list(subset.index) == [0]
+    assert len(filter_query(df, None)) == 2
+
+
+def test_filter_query_case_sensitive():
+    # as the WFS server, string comparisons are case-sensitive
+    df = geopandas.GeoDataFrame(
+        {
+            "rec_rvqc_code": ["pr", "PR", "Pr", "m"],
+            "park_type": ["Regional Park", "REGIONAL PARK", "regional", None],
+        },
+        geometry=[box(0, 0, 1, 1)] * 4,
+        crs="EPSG:3005",
+    )
+    assert list(filter_query(df, "REC_RVQC_CODE = 'pr'").index) == [0]
+    assert list(filter_query(df, "REC_RVQC_CODE IN ('PR', 'm')").index) == [1, 3]
+    assert list(filter_query(df, "PARK_TYPE LIKE 'Regional%'").index) == [0]
+
+
+def test_download_group_query_fallback(monkeypatch):
+    # a query sqlite can not evaluate (ECQL temporal operator) - each source is read
+    # separately, with its own query
+    sources = [
+        {
+            "alias": alias,
+            "index": index,
+            "description": alias,
+            "source_type": "BCGW",
+            "source": "WHSE_TANTALIS.TA_PARK_ECORES_PA_SVW",
+            "query": query,
+            "primary_key": "id",
+            "field_mapper": {"name": "name"},
+            "data": {"harvest_restriction": 1},
+        }
+        for alias, index, query in [
+            ("a", 1, "NAME = 'a'"),
+            ("b", 2, "ESTABLISHED DURING 2020-01-01T00:00:00Z/2021-01-01T00:00:00Z"),
+        ]
+    ]
+    queries = []
+
+    def read_source(source, query):
+        queries.append(query)
+        return geopandas.GeoDataFrame(
+            {"id": [1, 2], "name": ["a", "b"], "established": ["2019", "2020"]},
+            geometry=[box(0, 0, 1, 1)] * 2,
+            crs="EPSG:3005",
+        )
+
+    def read_source_chunks(source, query, chunk_size):
+        yield read_source(source, query)
+
+    monkeypatch.setattr(harvest_restrictions, "read_source", read_source)
+    monkeypatch.setattr(harvest_restrictions, "read_source_chunks", read_source_chunks)
+    monkeypatch.setattr(harvest_restrictions, "default_primary_key", lambda s: None)
+    union = union_query(sources)
+    dfs = download_group(sources)
+    assert queries == [union] + [s["query"] for s in sources]
+    assert [df["alias"].iloc[0] for df in dfs] == ["a", "b"]
+    queries.clear()
+    chunks = list(download_group_chunks(sources, 10))
+    assert queries == [union] + [s["query"] for s in sources]
+    assert [i for i, _ in chunks] == [0, 1]
+
+
+def test_file_url(monkeypatch):
+    monkeypatch.setenv("BUCKET", "bucket")
+    assert (
+        file_url("/vsizip//vsis3/$BUCKET/harvest_restrictions/sources/CRD.gdb.zip")
+        == "s3://bucket/harvest_restrictions/sources/CRD.gdb.zip"
+    )
+    assert file_url("/vsizip/data/a.zip/a.shp") == "data/a.zip"
+    assert file_url("data/a.gpkg") == "data/a.gpkg"
+
+
+def test_to_multipart():
+    df = geopandas.GeoDataFrame(
+        geometry=[
+            Point(0, 0),
+            LineString([(0, 0), (1, 1)]),
+            box(0, 0, 1, 1),
+            MultiPolygon([box(0, 0, 1, 1)]),
+            None,
+        ],
+        crs="EPSG:3005",
+    ).rename_geometry("geom")
+    df = to_multipart(df)
+    assert list(df.geom_type[:4]) == [
+        "MultiPoint",
+        "MultiLineString",
+        "MultiPolygon",
+        "MultiPolygon",
+    ]
+    assert df["geom"].iloc[4] is None
+    assert df.crs == "EPSG:3005"
+
+
+def test_cache_group_chunks(tmpdir):
+    df = geopandas.GeoDataFrame(
+        {"name": [f"name_{i % 3}" for i in range(10)], "code": range(10)},
+        geometry=[box(i, 0, i + 1, 1) for i in range(10)],
+        crs="EPSG:3005",
+    )
+    df.to_file(str(tmpdir.join("test.gpkg")), layer="test")
+    source = {
+        "description": "Test",
+        "source_type": "FILE",
+        "source": str(tmpdir.join("test.gpkg")),
+        "layer": "test",
+        "primary_key": "code",
+        "field_mapper": {"name": "name", "notes": None},
+        "data": {"harvest_restriction": 1},
+    }
+    sources = [
+        dict(source, alias="a", index=1, query="name = 'name_1'"),
+        dict(source, alias="b", index=2, query="code > 6"),
+    ]
+    out_files = cache_group(sources, str(tmpdir), chunk_size=2)
+    a, b = [geopandas.read_parquet(f) for f in out_files]
+    assert list(a["primary_key"]) == ["1", "4", "7"]
+    assert list(b["primary_key"]) == ["7", "8", "9"]
+    assert a["notes"].isna().all()
+    assert list(a.geom_type.unique()) == ["MultiPolygon"]
+    assert a.crs == "EPSG:3005"
+    with pytest.raises(ValueError):
+        cache_group(
+            [dict(source, alias="c", index=3, query="code > 10")],
+            str(tmpdir),
+            chunk_size=2,
+        )
+
+
+def test_cache_group_chunk_types(tmpdir, monkeypatch):
+    # columns typed differently per chunk - all null, int, and int with nulls (as float)
+    source = {
+        "alias": "a",
+        "index": 1,
+        "description": "Test",
+        "source_type": "FILE",
+        "source": "test.gpkg",
+        "query": None,
+        "primary_key": "code",
+        "field_mapper": {"name": "label"},
+        "data": {"harvest_restriction": 1},
+    }
+    chunks = [
+        {"label": [None, None], "code": [1, 2]},
+        {"label": [5, 6], "code": [3, 4]},
+        {"label": [7.0, numpy.nan], "code": [5, 6]},
+    ]
+
+    def download_group_chunks(sources, chunk_size):
+        for chunk in chunks:
+            df = geopandas.GeoDataFrame(
+                chunk, geometry=[box(0, 0, 1, 1)] * 2, crs="EPSG:3005"
+            )
+            yield 0, standardize_source(source, df)
+
+    monkeypatch.setattr(
+        harvest_restrictions, "download_group_chunks", download_group_chunks
+    )
+    (out_file,) = cache_group([source], str(tmpdir), chunk_size=2)
+    df = geopandas.read_parquet(out_file)
+    assert df["name"].isna().tolist() == [True, True, False, False, False, True]
+    assert df["name"].dropna().tolist() == ["5", "6", "7"]
+    assert df["harvest_restriction"].tolist() == [1] * 6
+
+
+def test_write_parquet(tmpdir):
+    df = geopandas.GeoDataFrame(
+        {"code": range(4)},
+        geometry=[box(10, 10, 11, 11), None, box(0, 0, 1, 1), box(5, 5, 6, 6)],
+        crs="EPSG:3005",
+    )
+    assert list(sort_spatially(df)["code"]) == [2, 3, 0, 1]
+    out_file = str(tmpdir.join("test.parquet"))
+    write_parquet(df, out_file, row_group_size=2)
+    parquet = pyarrow.parquet.ParquetFile(out_file)
+    geo = json.loads(parquet.schema_arrow.metadata[b"geo"])
+    assert geo["version"] == "1.1.0"
+    assert "covering" in geo["columns"]["geometry"]
+    assert parquet.metadata.num_row_groups == 2
+    assert list(geopandas.read_parquet(out_file, bbox=(0, 0, 2, 2))["code"]) == [2]
+
+
+@pytest.mark.skipif(
+    not os.environ.get("DATABASE_URL"), reason="requires a postgis database"
+)
+def test_load_parquet(tmpdir):
+    df = geopandas.GeoDataFrame(
+        {"primary_key": ["", 'a,"b'], "name": [None, "x"]},
+        geometry=[box(0, 0, 1, 1), None],
+        crs="EPSG:3005",
+    ).rename_geometry("geom")
+    in_file = str(tmpdir.join("test.parquet"))
+    write_parquet(df, in_file)
+    db = create_engine(os.environ["DATABASE_URL"])
+    conn = db.raw_connection()
+    try:
+        assert load_parquet(conn, in_file, "hr_test_load", replace=True) == 2
+        conn.commit()
+        loaded = geopandas.read_postgis(
+            "select * from hr_test_load order by primary_key", db, geom_col="geom"
+        )
+        with conn.cursor() as cursor:
+            cursor.execute("DROP TABLE hr_test_load")
+        conn.commit()
+    finally:
+        conn.close()
+    assert list(loaded["primary_key"]) == ["", 'a,"b']
+    assert loaded["name"].iloc[0] is None
+    assert loaded.crs == "EPSG:3005"
+    assert loaded.geom.iloc[0].equals(box(0, 0, 1, 1))
+
+
+def test_read_sql(tmpdir):
+    sql_file = str(tmpdir.join("test.sql"))
+    with open(sql_file, "w") as f:
+        f.write(
+            "select area::numeric, name like 'a%' from :table where map_tile = :'tile';"
+        )
+    assert read_sql(sql_file, {"table": "designations"}) == (
+        "select area::numeric, name like 'a%%' from designations where map_tile = %(tile)s;"
+    )
+    with pytest.raises(ValueError):
+        read_sql(sql_file)
+
+
+OVERLAY_FIXTURE_SQL = """
+CREATE SCHEMA IF NOT EXISTS whse_basemapping;
+CREATE TABLE IF NOT EXISTS whse_basemapping.nts_50k_grid (map_tile text, geom geometry);
+CREATE TEMPORARY TABLE harvest_restriction_class_rank_name_xref AS
+SELECT * FROM (VALUES (1, 'Protected'), (2, 'Prohibited'), (6, 'No Special Restriction'))
+AS x (harvest_restriction_class_rank, harvest_restriction_class_name);
+CREATE TEMPORARY TABLE harvest_restrictions (
+  harvest_restrictions_id serial primary key,
+  land_designation_name text,
+  land_designation_type_rank integer,
+  land_designation_type_code text,
+  land_designation_type_name text,
+  land_designation_primary_key text,
+  harvest_restriction_class_rank integer,
+  harvest_restriction_class_name text,
+  all_land_desig_names text[],
+  all_land_desig_type_ranks text[],
+  all_land_desig_type_codes text[],
+  all_land_desig_type_names text[],
+  all_land_desig_primary_keys text[],
+  all_harv_restrict_class_ranks integer[],
+  all_harv_restrict_class_names text[],
+  map_tile_250k text,
+  geom geometry(MULTIPOLYGON, 3005),
+  area_ha double precision GENERATED ALWAYS AS (st_area(geom) / 10000) STORED,
+  designated_land boolean GENERATED ALWAYS AS (
+    all_harv_restrict_class_ranks @> ARRAY[6] and
+    all_harv_restrict_class_ranks != ARRAY[6]
+  ) STORED
+);
+CREATE TEMPORARY TABLE designations_tiled AS
+SELECT '092B' AS map_tile, index, alias, alias AS description, pk AS primary_key,
+  alias AS name, harvest_restriction, ST_SetSRID(geom::geometry, 3005) AS geom
+FROM (VALUES
+  (1, 'park', '1', 1, 'POLYGON((0 0, 100 0, 100 100, 0 100, 0 0), (40 40, 60 40, 60 60, 40 60, 40 40))'),
+  (2, 'reserve', '2', 2, 'POLYGON((50 50, 150 50, 150 150, 50 150, 50 50))'),
+  (3, 'island', '3', 2, 'POLYGON((45 45, 48 45, 48 48, 45 48, 45 45))'),
+  (2, 'reserve', '6', 2, 'POLYGON((200 200, 250 200, 250 250, 200 250, 200 200))'),
+  (2, 'reserve', '7', 2, 'POLYGON((280 280, 320 280, 320 320, 280 320, 280 280))'),
+  (4, 'land', '4', 6, 'POLYGON((-50 -50, 300 -50, 300 300, -50 300, -50 -50))'),
+  (4, 'land', '5', 6, 'POLYGON((500 500, 600 500, 600 600, 500 600, 500 500))')
+) AS d (index, alias, pk, harvest_restriction, geom);
+"""
+
+
+@pytest.mark.skipif(
+    not os.environ.get("DATABASE_URL"), reason="requires a postgis database"
+)
+def test_overlay_engines():
+    conn = create_engine(os.environ["DATABASE_URL"]).raw_connection()
+    results = {}
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(OVERLAY_FIXTURE_SQL)
+            for engine, sql_file in OVERLAY_ENGINES.items():
+                cursor.execute("DELETE FROM harvest_restrictions")
+                cursor.execute(read_sql(sql_file), {"tile": "092B", "cell": None})
+                cursor.execute(
+                    "SELECT all_land_desig_type_codes, designated_land, "
+                    "round((area_ha * 10000)::numeric) "
+                    "FROM harvest_restrictions ORDER BY 1, 3"
+                )
+                results[engine] = cursor.fetchall()
+                if engine == "clustered":
+                    # the land layer is not clustered, the other designations are in
+                    # several clusters (one straddling the edge of the land)
+                    cursor.execute("SELECT count(DISTINCT cluster_id) FROM clustered")
+                    assert cursor.fetchone()[0] == 3
+                cursor.execute(
+                    "DROP TABLE IF EXISTS cleaned, clustered, land, land_dissolved, "
+                    "pieces, piece_designations, piece_land"
+                )
+    finally:
+        # discard all fixtures
+        conn.rollback()
+        conn.close()
+    assert len(results["polygonize"]) == 9
+    for engine in OVERLAY_ENGINES:
+        assert results[engine] == results["polygonize"]
+
+
+def test_overlay_tile_python():
+    # as OVERLAY_FIXTURE_SQL
+    designations = geopandas.GeoDataFrame(
+        {
+            "index": [1, 2, 3, 4, 4],
+            "alias": ["park", "reserve", "island", "land", "land"],
+            "primary_key": ["1", "2", "3", "4", "5"],
+            "harvest_restriction": [1, 2, 2, 6, 6],
+        },
+        geometry=[
+            wkt.loads(
+                "POLYGON((0 0, 100 0, 100 100, 0 100, 0 0), (40 40, 60 40, 60 60, 40 60, 40 40))"
+            ),
+            box(50, 50, 150, 150),
+            box(45, 45, 48, 48),
+            box(-50, -50, 300, 300),
+            box(500, 500, 600, 600),
+        ],
+        crs="EPSG:3005",
+    ).rename_geometry("geom")
+    designations["description"] = designations["alias"]
+    designations["name"] = designations["alias"]
+    rows = overlay_tile_python("092B", box(-100, -100, 1000, 1000), designations)
+    results = sorted(
+        (r["all_land_desig_type_codes"], round(r["geom"].area)) for r in rows
+    )
+    assert results == [
+        (["island", "land"], 9),
+        (["land"], 10000),
+        (["land"], 105291),
+        (["park", "land"], 7200),
+        (["park", "reserve", "land"], 2400),
+        (["reserve", "land"], 7600),
+    ]
+    assert all(r["geom"].geom_type == "MultiPolygon" for r in rows)
+
+
+@pytest.mark.parametrize(
+    "option",
+    [
+        ["--designations_table", "designations"],
+        ["--split_vertices", "1000"],
+        ["--tile_timeout", "60"],
+        ["--resume"],
+        ["--incremental"],
+        ["--dissolve"],
+    ],
+)
+def test_overlay_python_options(option):
+    # options of the database engines only are rejected, before any work is done
+    result = CliRunner().invoke(
+        harvest_restrictions.cli,
+        ["overlay", "--engine", "python", "--bucket", "test", *option],
+    )
+    assert result.exit_code == 2
+    assert f"{option[0]} is not supported with --engine python" in result.output
+
+
+def test_connected_components():
+    components = connected_components([(5, 3), (1, 2), (3, 4), (7, 5)])
+    assert components == {1: 1, 2: 1, 3: 3, 4: 3, 5: 3, 7: 3}
+    assert connected_components([]) == {}
+
+
+def test_summarize_overlay():
+    # per land designation totals, as sql/summary.sql
+    df = pandas.DataFrame(
+        [
+            [1, "Protected", 1, "park", "Park", 10.4],
+            [1, "Protected", 2, "reserve", "Reserve", 0.2],
+            [2, "Prohibited", 3, "island", "Island", 2.5],
+        ],
+        columns=[
+            "harvest_restriction_class_rank",
+            "harvest_restriction_class_name",
+            "land_designation_type_rank",
+            "land_designation_type_code",
+            "land_designation_type_name",
+            "area_ha",
+        ],
+    )
+    land_designations, harvest_restrictions = summarize_overlay(df)
+    assert land_designations["area_ha"].tolist() == [10, 0, 3]
+    # rolled up before rounding
+    assert harvest_restrictions[
+        ["harvest_restriction_class_rank", "area_ha"]
+    ].values.tolist() == [[1, 11], [2, 3]]
+
+
+@pytest.fixture
+def bucket(monkeypatch):
+    """an empty, versioned (mock) s3 bucket"""
+    for var in ["AWS_ENDPOINT_URL", "AWS_PROFILE"]:
+        monkeypatch.delenv(var, raising=False)
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    with mock_aws():
+        s3_client.cache_clear()
+        s3_client().create_bucket(Bucket="test")
+        s3_client().put_bucket_versioning(
+            Bucket="test", VersioningConfiguration={"Status": "Enabled"}
+        )
+        yield "test"
+    s3_client.cache_clear()
+
+
+def test_s3_versions(bucket, tmp_path):
+    for run_id in ["1", "2"]:
+        local_file = tmp_path / "test.csv"
+        local_file.write_text(run_id)
+        s3_upload_and_tag(
+            bucket, str(local_file), "draft/test.csv", {"commit": "a", "run_id": run_id}
+        )
+    assert s3_get_tags(bucket, "draft/test.csv") == {"commit": "a", "run_id": "2"}
+    # most recent version matching the tags
+    version_id, tags = s3_find_version(
+        bucket, "draft/test.csv", commit="a", run_id=None
+    )
+    assert tags["run_id"] == "2"
+    version_id, tags = s3_find_version(bucket, "draft/test.csv", run_id="1")
+    s3_download_version(bucket, "draft/test.csv", version_id, str(tmp_path / "1.csv"))
+    assert (tmp_path / "1.csv").read_text() == "1"
+    assert s3_find_version(bucket, "draft/test.csv", commit="b") == (None, None)
+
+
+def test_s3_download_current(bucket, tmp_path):
+    local_file = str(tmp_path / "test.csv")
+    assert not s3_download_current(bucket, "test.csv", local_file)
+    s3_upload_and_tag(bucket, __file__, "test.csv", {"commit": "a"})
+    assert s3_download_current(bucket, "test.csv", local_file)
+    s3_delete(bucket, "test.csv")
+    assert not s3_download_current(bucket, "test.csv", local_file)
+
+
+def test_s3_find_version_manifest(bucket, tmp_path):
+    local_file = str(tmp_path / "test.csv")
+    open(local_file, "w").close()
+    for run_id in ["1", "2", "3"]:
+        s3_upload_and_tag(bucket, local_file, "test.csv", {"run_id": run_id})
+    manifest = s3_read_manifest(bucket, "test.csv")
+    assert [v["tags"]["run_id"] for v in manifest] == ["3", "2", "1"]
+    version_id, _ = s3_find_version(bucket, "test.csv", run_id="2")
+    assert version_id == manifest[1]["version_id"]
+    # objects without a manifest are found by listing versions, and the manifest written
+    s3_client().delete_object(
+        Bucket=bucket, Key=f"harvest_restrictions/{manifest_key('test.csv')}"
+    )
+    assert s3_read_manifest(bucket, "test.csv") is None
+    assert s3_find_version(bucket, "test.csv", run_id="2") == (
+        version_id,
+        {"run_id": "2"},
+    )
+    assert s3_read_manifest(bucket, "test.csv") == manifest
+    # a manifest entry recording the wrong version is not trusted
+    s3_write_manifest(
+        bucket,
+        "test.csv",
+        [{"version_id": manifest[0]["version_id"], "tags": {"run_id": "2"}}],
+    )
+    assert s3_find_version(bucket, "test.csv", run_id="2")[0] == version_id
+    # entries for versions that no longer exist are dropped
+    s3_client().delete_object(
+        Bucket=bucket, Key="harvest_restrictions/test.csv", VersionId=version_id
+    )
+    assert s3_find_version(bucket, "test.csv", run_id="2") == (None, None)
+    assert [v["tags"]["run_id"] for v in s3_read_manifest(bucket, "test.csv")] == [
+        "3",
+        "1",
+    ]
+
+
+def test_s3_publish(bucket, tmp_path):
+    small = tmp_path / "small.csv"
+    small.write_text("a")
+    # large enough for a multipart upload, in 5MB parts
+    large = tmp_path / "large.gpkg"
+    large.write_bytes(os.urandom(6 * 1024 * 1024))
+    tags = {"commit": "a", "run_id": "1"}
+    s3_publish(
+        bucket,
+        tags,
+        [(str(small), "draft/small.csv"), (str(large), "draft/large.gpkg")],
+        part_size=5,
+        concurrency=2,
+    )
+    for key in ["draft/small.csv", "draft/large.gpkg"]:
+        assert s3_get_tags(bucket, key) == tags
+        assert s3_find_version(bucket, key, **tags)[0]
+    head = s3_client().head_object(
+        Bucket=bucket, Key="harvest_restrictions/draft/large.gpkg"
+    )
+    assert head["ContentLength"] == 6 * 1024 * 1024
+    assert head["ETag"].endswith('-2"')
+    # copies run alongside uploads, and a failure of either is raised once all are done
+    version_id, _ = s3_find_version(bucket, "draft/small.csv", **tags)
+    with pytest.raises(RuntimeError, match=r"missing\.csv"):
+        s3_publish(
+            bucket,
+            {"release": "v1"},
+            [(str(tmp_path / "missing.csv"), "missing.csv")],
+            [("draft/small.csv", version_id, "small.csv")],
+        )
+    assert s3_get_tags(bucket, "small.csv") == {"release": "v1"}
+
+
+def test_s3_copy_version(bucket, tmp_path):
+    local_file = tmp_path / "sources.csv"
+    for run_id in ["1", "2"]:
+        local_file.write_text(run_id)
+        s3_upload_and_tag(
+            bucket, str(local_file), "draft/sources.csv", {"run_id": run_id}
+        )
+    version_id, _ = s3_find_version(bucket, "draft/sources.csv", run_id="1")
+    s3_copy_version(
+        bucket, "draft/sources.csv", version_id, "sources.csv", {"release": "v1"}
+    )
+    assert s3_get_tags(bucket, "sources.csv") == {"release": "v1"}
+    assert s3_find_version(bucket, "sources.csv", release="v1")[0]
+    assert s3_download_current(bucket, "sources.csv", str(local_file))
+    assert local_file.read_text() == "1"
+
+
+def test_s3_unzip_version(bucket, tmp_path):
+    gpkg = os.urandom(6 * 1024 * 1024)
+    local_zip = str(tmp_path / "test.gpkg.zip")
+    with zipfile.ZipFile(local_zip, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("test.gpkg", gpkg)
+    s3_upload_and_tag(bucket, local_zip, "draft/test.gpkg.zip", {"run_id": "1"})
+    version_id, _ = s3_find_version(bucket, "draft/test.gpkg.zip", run_id="1")
+    s3_unzip_version(
+        bucket, "draft/test.gpkg.zip", version_id, "test.gpkg", {"release": "v1"}
+    )
+    assert s3_get_tags(bucket, "test.gpkg") == {"release": "v1"}
+    assert s3_download_current(bucket, "test.gpkg", str(tmp_path / "test.gpkg"))
+    assert (tmp_path / "test.gpkg").read_bytes() == gpkg
+
+
+def test_clear_cache_s3(bucket):
+    keys = [
+        "cache/hr_01_a.parquet",
+        "cache/hr_manifest.json",
+        "cache/other.parquet",
+        "cache/sub/hr_02_b.parquet",
+        "hr_03_c.parquet",
+    ]
+    for key in keys:
+        s3_client().put_object(Bucket=bucket, Key=key, Body=b"")
+
+    def listed():
+        return [
+            o["Key"] for o in s3_client().list_objects_v2(Bucket=bucket)["Contents"]
+        ]
+
+    for args, remaining in [
+        (["--dry_run"], keys),
+        ([], ["cache/other.parquet", "cache/sub/hr_02_b.parquet", "hr_03_c.parquet"]),
+    ]:
+        result = CliRunner().invoke(
+            harvest_restrictions.cli,
+            ["clear-cache", "--path", f"s3://{bucket}/cache/", *args],
+        )
+        assert result.exit_code == 0, result.output
+        assert listed() == remaining
+
+
+def test_release_vrt():
+    url = "/vsizip/{/vsicurl/https://example.com/a.gpkg.zip?versionId=1&X-Amz-Signature=2}/a.gpkg"
+    root = ET.fromstring(
+        release_vrt(
+            [
+                ("harvest_restrictions", url, "harvest_restrictions"),
+                ("sources", "sources.csv", None),
+            ]
+        )
+    )
+    spatial, table = root.findall("OGRVRTLayer")
+    assert spatial.get("name") == "harvest_restrictions"
+    assert spatial.find("SrcDataSource").text == url
+    assert spatial.find("GeometryType") is None
+    assert table.find("SrcLayer").text == "sources"
+    assert table.find("GeometryType").text == "wkbNone"